@@ -0,0 +1,66 @@
+#!/usr/bin/env bash
+# Keeps state/history/ (the append-only aging history) on a dedicated branch,
+# since the actions cache evicts entries and can't be trusted with months of rows.
+#
+#   aging-history.sh restore [init]   copy the branch's history into state/history
+#   aging-history.sh save             commit state/history back to the branch
+#
+# restore fails when the branch is missing, unless `init` is passed (first run).
+set -euo pipefail
+
+BRANCH="${HISTORY_BRANCH:-aging-history}"
+WORKTREE="${RUNNER_TEMP:-/tmp}/aging-history"
+
+case "${1:-}" in
+  restore)
+    if ! git fetch --depth=1 origin "refs/heads/$BRANCH"; then
+      if [ "${2:-}" = "init" ]; then
+        echo "::warning::No $BRANCH branch yet; starting a new aging history"
+        rm -rf state/history
+        exit 0
+      fi
+      echo "::error::Aging history branch $BRANCH not found. Run the workflow manually with init_history to start a new history."
+      exit 1
+    fi
+    git worktree add --detach "$WORKTREE" FETCH_HEAD
+    if [ ! -d "$WORKTREE/history" ]; then
+      echo "::error::$BRANCH has no history/ directory"
+      exit 1
+    fi
+    # The branch is the source of truth; drop whatever the cache restored
+    rm -rf state/history
+    mkdir -p state
+    cp -r "$WORKTREE/history" state/history
+    echo "Restored $(find state/history -name dict.json | wc -l) months of aging history"
+    ;;
+
+  save)
+    if [ ! -d state/history ]; then
+      echo "No aging history recorded this run"
+      exit 0
+    fi
+    if [ ! -d "$WORKTREE" ]; then
+      git worktree add --detach "$WORKTREE"
+      git -C "$WORKTREE" checkout -q --orphan "$BRANCH"
+      git -C "$WORKTREE" rm -rfq .
+    fi
+    rm -rf "$WORKTREE/history"
+    cp -r state/history "$WORKTREE/history"
+
+    cd "$WORKTREE"
+    git config user.name "github-actions[bot]"
+    git config user.email "41898282+github-actions[bot]@users.noreply.github.com"
+    git add -A history
+    if git diff --cached --quiet; then
+      echo "Aging history unchanged"
+      exit 0
+    fi
+    git commit -q -m "Aging history $(date -u +%F)"
+    git push origin "HEAD:refs/heads/$BRANCH"
+    ;;
+
+  *)
+    echo "usage: $0 restore [init] | save" >&2
+    exit 2
+    ;;
+esac
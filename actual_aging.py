@@ -1,7 +1,22 @@
 import json
-import requests
-from datetime import datetime, timedelta, date
-from urllib.parse import quote, unquote
+from collections import defaultdict
+from datetime import date
+from urllib.parse import quote
+
+import field_cache
+import metrics
+from aging_history import HistoryWriter
+from business_calendar import load_calendar
+from change_plan import run_pages
+from clickup_http import API_BASE
+from list_config import ListConfig
+from page_fetcher import iter_pages
+from task_record import normalize, projector
+
+try:
+    import numpy as np
+except ImportError:  # batch aging falls back to the calendar index
+    np = None
 
 # ---------------- CONFIG LOADERS ---------------- #
 
@@ -12,18 +27,12 @@ def load_json(path):
 # ---------------- WORKING DAYS CALCULATOR ---------------- #
 
 class WorkingDaysCalculator:
-    def __init__(self, holidays_file):
-        self.holidays = self._load_holidays(holidays_file)
-
-    def _load_holidays(self, path):
-        try:
-            data = load_json(path)
-            return {
-                datetime.strptime(d, "%Y-%m-%d").date()
-                for d in data.get("holidays", [])
-            }
-        except Exception:
-            return set()
+    def __init__(self, calendar):
+        # A holidays file that fails to load raises; aging is never silently
+        # computed without holidays
+        self.calendar = calendar
+        self.holidays = calendar.holidays
+        self._busdaycal = None
 
     def is_working_day(self, d):
         return d.weekday() < 5 and d not in self.holidays
@@ -31,21 +40,34 @@ class WorkingDaysCalculator:
     def calculate(self, start_date, end_date):
         if start_date > end_date:
             return 0
+        return self.calendar.count(start_date, end_date)
 
-        count = 0
-        current = start_date
-        while current < end_date:
-            if self.is_working_day(current):
-                count += 1
-            current += timedelta(days=1)
-        return count
+    def calculate_many(self, start_dates, end_dates):
+        """
+        Aging for many (start, end) pairs at once; same semantics as calculate().
+        Uses numpy.busday_count with the holidays as the business-day calendar
+        when numpy is installed.
+        """
+        if np is None:
+            return [self.calculate(s, e) for s, e in zip(start_dates, end_dates)]
+
+        if self._busdaycal is None:
+            self._busdaycal = np.busdaycalendar(
+                weekmask="1111100",
+                holidays=sorted(self.holidays),
+            )
+
+        starts = np.array(start_dates, dtype="datetime64[D]")
+        ends = np.array(end_dates, dtype="datetime64[D]")
+        counts = np.busday_count(starts, ends, busdaycal=self._busdaycal)
+        return np.where(starts > ends, 0, counts).tolist()
 
 # ---------------- CLICKUP CLIENT ---------------- #
 
 class ClickUpClient:
-    BASE_URL = "https://api.clickup.com/api/v2"
+    BASE_URL = API_BASE
 
-    def __init__(self, config):
+    def __init__(self, config, lst=None):
         self.headers = {
             "Authorization": config["api_token"],
             "Content-Type": "application/json"
@@ -54,84 +76,74 @@ class ClickUpClient:
         self.kickoff_field_id = config["kickoff_field_id"]
         self.go_live_field_id = config["go_live_field_id"]
         self.aging_field_id = config["aging_field_id"]
-        self.required_tag = unquote(config["required_tag"]).lower()
-        print("🔎 Matching tag:", self.required_tag)
-
-        self.calculator = WorkingDaysCalculator("config/holidays.json")
-
-    def get_tasks_with_kickoff(self):
+        # Picks each task's holiday calendar (see ListConfig.calendar_name)
+        # and owns the required-tag guard shared with the other stages
+        self.list = lst or ListConfig(config)
+        self.required_tag = self.list.required_tag
+        print("🔎 Matching tag:", self.required_tag or "(any)")
+        self.calculators = {}
+        self.calculator = self.calculator_for(self.list.calendar)
+
+    def calculator_for(self, calendar_name):
+        if calendar_name not in self.calculators:
+            self.calculators[calendar_name] = WorkingDaysCalculator(load_calendar(name=calendar_name))
+        return self.calculators[calendar_name]
+
+    def iter_task_pages(self):
         """
-        Fetch only tasks where the kickoff custom field is set using ClickUp API filter.
-        Prints task details for debugging.
+        Yield pages of tasks where the kickoff custom field is set (ClickUp API filter).
+        A few pages are fetched ahead (page_fetcher), so writes for the current
+        page run while the next ones are in flight.
         """
         filter_obj = [
             {"field_id": self.kickoff_field_id, "operator": "IS NOT NULL"}
         ]
         encoded_filter = quote(json.dumps(filter_obj))
 
-        url = f"{self.BASE_URL}/list/{self.list_id}/task"
-        params = f"include_closed=true&subtasks=false&custom_fields={encoded_filter}"
-        full_url = f"{url}?{params}"
-
-        response = requests.get(full_url, headers=self.headers)
-        response.raise_for_status()
-        tasks = response.json().get("tasks", [])
-
-        print(f"ℹ Fetched {len(tasks)} tasks with kickoff date set\n")
-
-        # Print task details
-        for task in tasks:
-            name = task.get("name")
-            status = task.get("status", {}).get("status")
-            kickoff = self.get_custom_field(task, self.kickoff_field_id)
-            go_live = self.get_custom_field(task, self.go_live_field_id)
-            print(f"Task: {name} | Status: {status} | Kickoff: {kickoff} | Go Live: {go_live}")
+        url = (f"{self.BASE_URL}/list/{self.list_id}/task"
+               f"?include_closed=true&subtasks=false&custom_fields={encoded_filter}")
 
-        return tasks
+        # Only the fields this stage reads are kept from each task
+        field_ids = {self.kickoff_field_id, self.go_live_field_id, self.aging_field_id}
+        # ...plus what the aging history records next to the aging
+        field_ids |= {self.list.baseline_field_id, self.list.sentiment_field_id, self.list.commerce_platform_field_id}
+        if self.list.calendar_field_id:
+            field_ids.add(self.list.calendar_field_id)
+        project = projector(field_ids)
 
-    def update_field(self, task_id, value):
-        url = f"{self.BASE_URL}/task/{task_id}/field/{self.aging_field_id}"
-        response = requests.post(url, headers=self.headers, json={"value": str(value)})
-        if not response.ok:
-            print(f"✗ Failed update for {task_id}: {response.status_code}, {response.text}")
-        return response.ok
+        for page, tasks in enumerate(iter_pages(url, self.headers, project=project)):
+            print(f"ℹ Page {page}: fetched {len(tasks)} tasks with kickoff date set")
+            yield normalize(tasks)
 
     @staticmethod
     def get_custom_field(task, field_id):
-        for field in task.get("custom_fields", []):
-            if field["id"] == field_id and field.get("value"):
-                if field["type"] == "date":
-                    return datetime.fromtimestamp(int(field["value"]) / 1000).date()
-                return field["value"]
-        return None
+        if field_id in task.dates:
+            return task.dates[field_id]
+        return task.get(field_id) or None
 
-    @staticmethod
-    def has_required_tag(task, tag):
-        return tag in [t["name"].lower() for t in task.get("tags", [])]
+    def has_required_tag(self, task):
+        return self.list.has_required_tag(task.tags)
 
 # ---------------- MAIN LOGIC ---------------- #
 
 LIVE_STATUSES = {"live", "prod qa", "hypercare"}
 
-def main():
-    try:
-        config = load_json("config/clickup_config.json")
-    except Exception as e:
-        print(f"❌ Failed to load ClickUp config: {e}")
-        return
-
-    client = ClickUpClient(config)
-    tasks = client.get_tasks_with_kickoff()  # Fetch only tasks with kickoff
-
-    updated = skipped = 0
-    today = date.today()
+def process_tasks(client, tasks, queue, today=None):
+    """
+    Compute aging for a batch of tasks and queue the field updates.
+    Returns (queued, skipped).
+    """
+    eligible = []
+    queued = skipped = 0
+    today = today or date.today()
+    client.list.refresh_stale_options(tasks)  # calendar and history dropdowns
 
     for task in tasks:
-        name = task["name"]
-        status = task["status"]["status"].lower()
+        name = task.name
+        status = task.status.lower()
 
         # Check for required tag
-        if not client.has_required_tag(task, client.required_tag):
+        if not client.has_required_tag(task):
             print(f"⊘ Skipped: {name} (Missing required tag)")
             skipped += 1
             continue
@@ -147,20 +159,78 @@ def main():
         else:
             end_date = today
 
-        # Calculate aging
-        aging_days = client.calculator.calculate(kickoff, end_date)
+        eligible.append((task, kickoff, end_date))
+
+    # Calculate aging in one batch per holiday calendar
+    by_calendar = defaultdict(list)
+    for i, (task, _, _) in enumerate(eligible):
+        by_calendar[client.list.calendar_name(task)].append(i)
+
+    aging = [0] * len(eligible)
+    for calendar_name, indexes in by_calendar.items():
+        counts = client.calculator_for(calendar_name).calculate_many(
+            [eligible[i][1] for i in indexes],
+            [eligible[i][2] for i in indexes],
+        )
+        for i, days in zip(indexes, counts):
+            aging[i] = days
+
+    for (task, _, _), aging_days in zip(eligible, aging):
         aging_value = f"{aging_days}d"
 
-        # Update ClickUp field
-        if client.update_field(task["id"], aging_value):
-            print(f"✓ {name} [{task['status']['status']}] → Aging: {aging_value}")
-            updated += 1
+        # Queue the ClickUp field update (dropped if unchanged)
+        if queue.add(task, client.aging_field_id, aging_value, field_type="text", label="Aging"):
+            print(f"✓ {task.name} [{task.status}] → Aging: {aging_value}")
+            queued += 1
         else:
             skipped += 1
 
+    return queued, skipped
+
+def process_pages(client, pages, today=None, dry_run=False, history=None):
+    """
+    Stream pages through the stage: page N's writes drain while page N+1 is fetched
+    (or, with dry_run, go to a change plan). With a HistoryWriter, each page's
+    aging is snapshotted once its writes have landed; the sentiment field is
+    only refreshed by sentiment.py, so the snapshot classifies the new delta
+    itself. Returns (FlushReport, skipped).
+    """
+    def process_page(tasks, queue):
+        return process_tasks(client, tasks, queue, today)
+
+    def record(tasks):
+        tagged = [t for t in tasks if client.has_required_tag(t)]
+        history.add(tagged, client.list, classify=True)
+
+    report, totals = run_pages(
+        "aging", client.list_id, pages, client.headers, process_page, dry_run,
+        on_written=record if history is not None else None,
+    )
+    return report, totals[1] if totals else 0
+
+def main():
+    try:
+        config = load_json("config/clickup_config.json")
+    except Exception as e:
+        print(f"❌ Failed to load ClickUp config: {e}")
+        return
+
+    client = ClickUpClient(config)
+    dry_run = client.list.dry_run
+
+    # Dropdowns for the calendar field and the aging history (platform, baseline, sentiment)
+    client.list.use_fields(field_cache.load_fields(client.list_id, client.headers))
+    history = None if dry_run else HistoryWriter()
+    pages = client.iter_task_pages()  # Fetch only tasks with kickoff, page by page
+
+    report, skipped = process_pages(client, pages, dry_run=dry_run, history=history)
+    if history is not None:
+        history.close()
+
     print("\n" + "=" * 60)
-    print(f"Summary: {updated} updated | {skipped} skipped")
+    print(f"Summary: {report.written} updated | {skipped} skipped | {report.failed_total} failed")
     print("=" * 60)
+    metrics.export("actual_aging")
 
 # ---------------- ENTRY POINT ---------------- #
 
@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import threading
+from array import array
+from collections import Counter, defaultdict
+from datetime import date
+
+import sentiment
+from settings import STATE_DIR
+from sla_rules import platform_class, sentiment_options
+
+# ============================
+# CONFIGURATION
+# ============================
+
+HISTORY_DIR = os.path.join(STATE_DIR, "history")
+
+# Column name -> array typecode; one <name>.bin file per column and month
+COLUMNS = {
+    "date": "i",        # date ordinal
+    "task": "I",        # code into dict.json "task"
+    "platform": "H",    # code into dict.json "platform"
+    "aging": "i",       # days
+    "baseline": "i",    # days
+    "delta": "i",       # aging - baseline
+    "sentiment": "H",   # code into dict.json "sentiment"
+}
+DICT_COLUMNS = ("task", "platform", "sentiment")
+
+# Stand-in for a missing number
+MISSING = -2 ** 31
+
+_lock = threading.Lock()
+
+# ============================
+# PARTITIONS
+# ============================
+
+def partition_dir(day, root=HISTORY_DIR):
+    return os.path.join(root, f"{day.year:04d}-{day.month:02d}")
+
+def _column_path(part, name):
+    return os.path.join(part, f"{name}.bin")
+
+def _read_dicts(part):
+    try:
+        with open(os.path.join(part, "dict.json"), "r") as f:
+            return json.load(f)
+    except OSError:
+        return {name: [] for name in DICT_COLUMNS}
+
+def _write_dicts(part, dicts):
+    path = os.path.join(part, "dict.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dicts, f)
+    os.replace(tmp, path)
+
+def _row_count(part):
+    """Complete rows in a partition; columns cut short by a crash bound it."""
+    counts = []
+    for name, code in COLUMNS.items():
+        path = _column_path(part, name)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        counts.append(size // array(code).itemsize)
+    return min(counts)
+
+def _append(part, rows):
+    """
+    Append (date, task id, platform, aging, baseline, delta, sentiment) rows to
+    one partition. Strings are encoded against the partition's dictionaries,
+    which are saved before the columns so every code on disk resolves.
+    """
+    os.makedirs(part, exist_ok=True)
+    dicts = _read_dicts(part)
+    codes = {name: {value: i for i, value in enumerate(dicts[name])} for name in DICT_COLUMNS}
+
+    def encode(name, value):
+        table = codes[name]
+        if value not in table:
+            table[value] = len(dicts[name])
+            dicts[name].append(value)
+        return table[value]
+
+    columns = {name: array(code) for name, code in COLUMNS.items()}
+    for day, task_id, platform, aging, baseline, delta, label in rows:
+        columns["date"].append(day.toordinal())
+        columns["task"].append(encode("task", task_id))
+        columns["platform"].append(encode("platform", platform or ""))
+        columns["aging"].append(MISSING if aging is None else aging)
+        columns["baseline"].append(MISSING if baseline is None else baseline)
+        columns["delta"].append(MISSING if delta is None else delta)
+        columns["sentiment"].append(encode("sentiment", label or ""))
+
+    _write_dicts(part, dicts)
+
+    # Drop a torn tail from an interrupted append so the columns stay aligned
+    n = _row_count(part)
+    for name, values in columns.items():
+        path = _column_path(part, name)
+        with open(path, "ab") as f:
+            f.truncate(n * values.itemsize)
+            values.tofile(f)
+
+def read_partition(part):
+    """(columns, dicts) of one partition: name -> array, plus the string dictionaries."""
+    n = _row_count(part)
+    columns = {}
+    for name, code in COLUMNS.items():
+        values = array(code)
+        path = _column_path(part, name)
+        if n:
+            with open(path, "rb") as f:
+                values.frombytes(f.read(n * values.itemsize))
+        columns[name] = values
+    return columns, _read_dicts(part)
+
+def partitions(start=None, end=None, root=HISTORY_DIR):
+    """Partition directories overlapping [start, end], oldest first."""
+    if not os.path.isdir(root):
+        return []
+    first = f"{start.year:04d}-{start.month:02d}" if start else ""
+    last = f"{end.year:04d}-{end.month:02d}" if end else "9999-99"
+    return [
+        os.path.join(root, name)
+        for name in sorted(os.listdir(root))
+        if first <= name <= last and os.path.isdir(os.path.join(root, name))
+    ]
+
+# ============================
+# WRITE
+# ============================
+
+class HistoryWriter:
+    """
+    Collects one run's aging snapshot and appends it when closed, so a run
+    touches each column file once. Safe to share between threads (lists in
+    pipeline.py).
+    """
+
+    def __init__(self, day=None, root=HISTORY_DIR):
+        self.day = day or date.today()
+        self.root = root
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def add(self, tasks, lst, classify=False):
+        """
+        Snapshot every task with an actual aging value (fields must be loaded
+        into lst). With classify, the sentiment comes from the list's rules
+        instead of the task's sentiment field (for runs that don't update it).
+        """
+        rows = [row for row in (snapshot_row(t, lst, self.day, classify) for t in tasks) if row]
+        with self._lock:
+            self.rows.extend(rows)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            rows, self.rows = self.rows, []
+        if not rows:
+            return 0
+        with _lock:
+            _append(partition_dir(self.day, self.root), rows)
+        print(f"📚 Aging history: {len(rows)} rows for {self.day.isoformat()}")
+        return len(rows)
+
+def snapshot_row(task, lst, day, classify=False):
+    aging = sentiment.parse_days_from_text(task.get(lst.actual_aging_field_id))
+    if aging is None:
+        return None
+
+    baseline_dropdown = lst.resolver(lst.baseline_field_id)
+    baseline = None
+    if baseline_dropdown:
+        baseline = sentiment.parse_days_from_baseline_name(
+            baseline_dropdown.name_of(task.get(lst.baseline_field_id))
+        )
+
+    platform = platform_class(task, lst) if lst.resolver(lst.commerce_platform_field_id) else ""
+    delta = aging - baseline if baseline is not None else None
+
+    sentiment_dropdown = lst.resolver(lst.sentiment_field_id)
+    if classify:
+        label = ""
+        if delta is not None:
+            # The option name sentiment.py would write for this delta
+            label, option_id = sentiment_options([delta], [platform], lst)[0]
+            if option_id and sentiment_dropdown:
+                label = sentiment_dropdown.name_of(option_id)
+    else:
+        label = sentiment_dropdown.name_of(task.get(lst.sentiment_field_id)) if sentiment_dropdown else ""
+
+    return (day, task.id, platform, aging, baseline, delta, label)
+
+# ============================
+# READ
+# ============================
+
+def scan(start=None, end=None, root=HISTORY_DIR):
+    """
+    (date, task id, platform, aging, baseline, delta, sentiment) rows with
+    start <= date <= end, oldest partition first. A task recorded twice on one
+    day (a rerun) yields only its last row. Missing numbers are None.
+    """
+    lo = start.toordinal() if start else None
+    hi = end.toordinal() if end else None
+
+    def num(v):
+        return None if v == MISSING else v
+
+    for part in partitions(start, end, root):
+        columns, dicts = read_partition(part)
+        dates = columns["date"]
+        tasks = columns["task"]
+
+        # Last row per (date, task) wins
+        latest = {}
+        for i in range(len(dates)):
+            d = dates[i]
+            if (lo is None or d >= lo) and (hi is None or d <= hi):
+                latest[(d, tasks[i])] = i
+
+        for i in sorted(latest.values()):
+            yield (
+                date.fromordinal(dates[i]),
+                dicts["task"][tasks[i]],
+                dicts["platform"][columns["platform"][i]],
+                num(columns["aging"][i]),
+                num(columns["baseline"][i]),
+                num(columns["delta"][i]),
+                dicts["sentiment"][columns["sentiment"][i]],
+            )
+
+def sla_report(start=None, end=None, root=HISTORY_DIR):
+    """
+    Per (month, platform): snapshots, distinct tasks, mean aging and delta,
+    and sentiment counts.
+    """
+    groups = defaultdict(lambda: {"rows": 0, "tasks": set(), "aging": [], "delta": [], "sentiment": Counter()})
+    for day, task_id, platform, aging, _, delta, label in scan(start, end, root):
+        g = groups[(f"{day.year:04d}-{day.month:02d}", platform)]
+        g["rows"] += 1
+        g["tasks"].add(task_id)
+        g["aging"].append(aging)
+        if delta is not None:
+            g["delta"].append(delta)
+        if label:
+            g["sentiment"][label.lower()] += 1
+
+    return [
+        {
+            "month": month,
+            "platform": platform,
+            "snapshots": g["rows"],
+            "tasks": len(g["tasks"]),
+            "mean_aging": round(sum(g["aging"]) / len(g["aging"]), 1),
+            "mean_delta": round(sum(g["delta"]) / len(g["delta"]), 1) if g["delta"] else None,
+            "sentiment": dict(g["sentiment"]),
+        }
+        for (month, platform), g in sorted(groups.items())
+    ]
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monthly SLA report from the aging history.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = sla_report(args.start, args.end)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'month':<9}{'platform':<12}{'snapshots':>10}{'tasks':>8}{'aging':>8}{'delta':>8}  sentiment")
+        for r in report:
+            delta = "-" if r["mean_delta"] is None else f"{r['mean_delta']:.1f}"
+            sentiments = ", ".join(f"{k} {v}" for k, v in sorted(r["sentiment"].items()))
+            print(f"{r['month']:<9}{r['platform'] or '-':<12}{r['snapshots']:>10}{r['tasks']:>8}"
+                  f"{r['mean_aging']:>8.1f}{delta:>8}  {sentiments}")
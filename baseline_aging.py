@@ -1,172 +1,113 @@
-import requests
-import json
-import os
 
-# ============================
-# LOAD CONFIG
-# ============================
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_PATH = os.path.join(BASE_DIR, "config", "clickup_config.json")
-
-with open(CONFIG_PATH, "r") as f:
-    cfg = json.load(f)
-
-API_TOKEN = cfg["api_token"]
-LIST_ID = cfg["list_id"]
-FIELD_COMMERCE_PLATFORM = cfg["commerce_platform_field_id"]
-FIELD_BASELINE = cfg["baseline_field_id"]
-REQUIRED_TAG = cfg.get("required_tag")
-
-HEADERS = {
-    "Authorization": API_TOKEN,
-    "Content-Type": "application/json"
-}
+import field_cache
+import metrics
+from change_plan import run_pages
+from clickup_http import API_BASE
+from list_config import default_list
+from page_fetcher import iter_pages
+from sla_rules import baseline_option, platform_class, rules_for
+from task_record import normalize, projector
 
 # ============================
-# PLATFORM LOGIC
+# CONFIGURATION
 # ============================
 
-RICH_PLATFORMS = ["woo", "woocommerce", "magento", "sfcc", "big"]
-
-PLATFORM_TO_BASELINE = {
-    "shopify": "9d",
-    "rich": "21d",
-    "custom": "35d"
-}
-
-# ============================
-# DROPDOWN MAPS
-# ============================
+LIST = default_list()
+LIST_ID = LIST.list_id
+FIELD_COMMERCE_PLATFORM = LIST.commerce_platform_field_id
+FIELD_BASELINE = LIST.baseline_field_id
+REQUIRED_TAG = LIST.required_tag
 
-PLATFORM_UUID_TO_NAME = {}
-PLATFORM_ID_BY_INDEX = []
-BASELINE_VALUE_TO_UUID = {}
+HEADERS = LIST.headers
 
 # ============================
 # CLICKUP HELPERS
 # ============================
 
-def fetch_dropdowns():
-    url = f"https://api.clickup.com/api/v2/list/{LIST_ID}/field"
-    r = requests.get(url, headers=HEADERS)
-    r.raise_for_status()
-
-    fields = r.json().get("fields", [])
+def fetch_dropdowns(fields=None, lst=LIST):
+    if fields is None:
+        fields = field_cache.load_fields(lst.list_id, lst.headers)
+    lst.use_fields(fields)
 
     # Commerce Platform dropdown
-    platform_field = next(f for f in fields if f["id"] == FIELD_COMMERCE_PLATFORM)
-    platform_opts = platform_field["type_config"]["options"]
-
-    global PLATFORM_UUID_TO_NAME, PLATFORM_ID_BY_INDEX
-    PLATFORM_UUID_TO_NAME = {o["id"]: o["name"].lower() for o in platform_opts}
-    PLATFORM_ID_BY_INDEX = [o["id"] for o in sorted(platform_opts, key=lambda x: x["orderindex"])]
+    if not lst.resolver(lst.commerce_platform_field_id):
+        raise RuntimeError(f"Commerce platform field id not found: {lst.commerce_platform_field_id}")
 
     # Baseline dropdown
-    baseline_field = next(f for f in fields if f["id"] == FIELD_BASELINE)
-    baseline_opts = baseline_field["type_config"]["options"]
-
-    global BASELINE_VALUE_TO_UUID
-    BASELINE_VALUE_TO_UUID = {
-        o["name"].lower(): o["id"]
-        for o in baseline_opts
-    }
-
-def get_all_tasks():
-    tasks = []
-    page = 0
-
-    while True:
-        url = f"https://api.clickup.com/api/v2/list/{LIST_ID}/task?page={page}&include_closed=true"
-        if REQUIRED_TAG:
-            url += f"&tags[]={REQUIRED_TAG}"
-
-        r = requests.get(url, headers=HEADERS)
-        data = r.json()
+    if not lst.resolver(lst.baseline_field_id):
+        raise RuntimeError(f"Baseline field id not found: {lst.baseline_field_id}")
 
-        if not data.get("tasks"):
-            break
+    # Platform classes and baselines come from config (see sla_rules)
+    missing = [
+        label for label, option_id in
+        (baseline_option(cls, lst) for cls in rules_for(lst).class_names())
+        if option_id is None
+    ]
+    if missing:
+        print("⚠️ Baseline options missing in ClickUp:", missing)
 
-        tasks.extend(data["tasks"])
-        page += 1
+def iter_task_pages(lst=LIST):
+    """Tagged tasks (open and closed), one projected and normalized page at a time."""
+    url = f"{API_BASE}/list/{lst.list_id}/task?include_closed=true{lst.tag_query()}"
 
-    return tasks
+    project = projector({lst.commerce_platform_field_id, lst.baseline_field_id})
+    for page in iter_pages(url, lst.headers, project=project):
+        yield normalize(page)
 
-def resolve_platform(task):
-    for f in task.get("custom_fields", []):
-        if f["id"] == FIELD_COMMERCE_PLATFORM:
-            raw = f.get("value")
-            option_id = None
+def resolve_platform(task, lst=LIST):
+    return platform_class(task, lst)
 
-            if isinstance(raw, int) and raw < len(PLATFORM_ID_BY_INDEX):
-                option_id = PLATFORM_ID_BY_INDEX[raw]
-            elif isinstance(raw, str):
-                option_id = raw
-            elif isinstance(raw, list) and raw:
-                option_id = raw[0]
-
-            if option_id:
-                name = PLATFORM_UUID_TO_NAME.get(option_id, "")
-                if "shopify" in name:
-                    return "shopify"
-                if any(p in name for p in RICH_PLATFORMS):
-                    return "rich"
-
-    return "custom"
-
-def get_baseline_value(task):
-    for f in task.get("custom_fields", []):
-        if f["id"] == FIELD_BASELINE:
-            return f.get("value")
-    return None
-
-def update_baseline(task_id, baseline_uuid):
-    url = f"https://api.clickup.com/api/v2/task/{task_id}/field/{FIELD_BASELINE}"
-    payload = {"value": baseline_uuid}
-
-    r = requests.post(url, headers=HEADERS, json=payload)
-
-    if r.status_code not in (200, 204):
-        print(f"❌ Failed for {task_id}: {r.text}")
-        return False
-
-    return True
+def get_baseline_value(task, lst=LIST):
+    return task.get(lst.baseline_field_id)
 
 # ============================
 # MAIN
 # ============================
 
-def run():
-    fetch_dropdowns()
-
-    tasks = get_all_tasks()
-    print(f"🔎 Processing {len(tasks)} tasks")
-
-    updated = skipped = 0
+def process_tasks(tasks, queue, lst=LIST):
+    """
+    Queue the platform baseline for tasks that have none yet. Returns (queued, skipped).
+    """
+    queued = skipped = 0
+    # A baseline is written once, so never from stale dropdown options
+    lst.refresh_stale_options(tasks)
 
     for task in tasks:
-        task_id = task["id"]
+        task_id = task.id
 
         # Skip if baseline already set
-        if get_baseline_value(task) is not None:
+        if get_baseline_value(task, lst) is not None:
             skipped += 1
             continue
 
-        platform = resolve_platform(task)
-        baseline_label = PLATFORM_TO_BASELINE[platform]
-
-        baseline_uuid = BASELINE_VALUE_TO_UUID.get(baseline_label.lower())
+        platform = resolve_platform(task, lst)
+        baseline_label, baseline_uuid = baseline_option(platform, lst)
         if not baseline_uuid:
             print(f"⚠️ Baseline option missing in ClickUp: {baseline_label}")
             continue
 
-        if update_baseline(task_id, baseline_uuid):
-            updated += 1
+        if queue.add(task, lst.baseline_field_id, baseline_uuid, field_type="drop_down", label="Baseline"):
+            queued += 1
             print(f"✅ {task_id} | {platform} → {baseline_label}")
 
+    return queued, skipped
+
+def run():
+    with metrics.stage("resolve"):
+        fetch_dropdowns()
+
+    report, totals = run_pages(
+        "baseline", LIST_ID, iter_task_pages(), HEADERS,
+        lambda tasks, queue: (len(tasks), *process_tasks(tasks, queue)),
+        LIST.dry_run,
+    )
+    processed, _, skipped = totals or (0, 0, 0)
+    print(f"🔎 Processed {processed} tasks")
+
     print("\n" + "=" * 60)
-    print(f"Summary: {updated} updated | {skipped} skipped")
+    print(f"Summary: {report.written} updated | {skipped} skipped | {report.failed_total} failed")
     print("=" * 60)
+    metrics.export("baseline_aging")
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# ============================
+# LOAD CONFIG
+# ============================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Importing main compiles calendars into the state dir; keep that out of the repo
+STATE = tempfile.TemporaryDirectory(prefix="clickup-bench-")
+os.environ.setdefault("CLICKUP_STATE_DIR", STATE.name)
+from main import FIELD_MAP  # noqa: E402  (stage date field ids live in main.py)
+from settings import cfg  # noqa: E402
+
+PAGE_SIZE = 100
+
+PLATFORMS = ["Shopify", "WooCommerce", "Magento", "SFCC", "BigCommerce", "Custom"]
+BASELINES = ["9d", "21d", "35d"]
+SENTIMENTS = ["Escalated, at risk", "Slightly delayed", "On time", "Delivered early"]
+
+# ============================
+# SYNTHETIC LIST
+# ============================
+
+def dropdown_field(field_id, name, labels):
+    options = [{"id": f"{field_id[:8]}-opt{i}", "name": n, "orderindex": i} for i, n in enumerate(labels)]
+    return {"id": field_id, "name": name, "type": "drop_down", "type_config": {"options": options}}
+
+def synthetic_list(n_tasks, seed=0, tag="#new"):
+    """
+    Field definitions plus n_tasks tasks shaped like ClickUp's list/task payloads.
+    About 90% carry the required tag, 10% are closed; aging and baseline are set
+    on roughly half so the sentiment stage has work.
+    """
+    rng = random.Random(seed)
+    fields = [
+        dropdown_field(cfg["commerce_platform_field_id"], "Commerce Platform", PLATFORMS),
+        dropdown_field(cfg["baseline_field_id"], "Baseline Aging", BASELINES),
+        dropdown_field(cfg["sentiment_field_id"], "Sentiment - Delivery", SENTIMENTS),
+        {"id": cfg["kickoff_field_id"], "name": "Kickoff Date", "type": "date"},
+        {"id": cfg["go_live_field_id"], "name": "Go Live Date", "type": "date"},
+        {"id": cfg["aging_field_id"], "name": "Actual Aging", "type": "text"},
+    ]
+    fields += [{"id": fid, "name": stage, "type": "date"} for stage, fid in FIELD_MAP.items()]
+    fields = list({f["id"]: f for f in fields}.values())
+
+    now_ms = int(time.time() * 1000)
+    tasks = []
+    for i in range(n_tasks):
+        created = now_ms - rng.randint(1, 400) * 86400 * 1000
+        closed = rng.random() < 0.1
+        values = {
+            cfg["commerce_platform_field_id"]: rng.choice([None, *range(len(PLATFORMS))]),
+            cfg["kickoff_field_id"]: str(created + rng.randint(0, 10) * 86400 * 1000) if rng.random() < 0.8 else None,
+            cfg["go_live_field_id"]: str(created + rng.randint(20, 120) * 86400 * 1000) if rng.random() < 0.3 else None,
+        }
+        if rng.random() < 0.5:
+            values[cfg["aging_field_id"]] = f"{rng.randint(0, 90)}d"
+            values[cfg["baseline_field_id"]] = rng.randrange(len(BASELINES))
+
+        custom_fields = []
+        for f in fields:
+            entry = {"id": f["id"], "name": f["name"], "type": f["type"]}
+            if "type_config" in f:
+                entry["type_config"] = f["type_config"]
+            if values.get(f["id"]) is not None:
+                entry["value"] = values[f["id"]]
+            custom_fields.append(entry)
+
+        tasks.append({
+            "id": f"bench{i:06d}",
+            "name": f"Bench task {i}",
+            "list": {"id": cfg["list_id"]},
+            "status": {"status": "complete" if closed else rng.choice(["open", "in progress", "live"]),
+                       "type": "closed" if closed else "open"},
+            "date_created": str(created),
+            "date_updated": str(min(now_ms, created + rng.randint(0, 30) * 86400 * 1000)),
+            "tags": [{"name": tag}] if rng.random() < 0.9 else [],
+            "custom_fields": custom_fields,
+        })
+    return fields, tasks
+
+# ============================
+# MOCK API
+# ============================
+
+class MockClickUp:
+    """
+    In-memory ClickUp list served over HTTP for benchmarks.
+
+      latency_ms  added to every response
+      rate_limit  requests allowed per window_s (0 = unlimited); answered with
+                  X-RateLimit-* headers and 429 once spent, like ClickUp
+      error_rate  probability of an extra injected 429 on any request
+    """
+
+    def __init__(self, fields, tasks, latency_ms=0, rate_limit=0, window_s=60, error_rate=0.0, seed=0):
+        self.fields = fields
+        self.tasks = {t["id"]: t for t in tasks}
+        self.order = [t["id"] for t in tasks]
+        self.listings = {}
+        self.latency_s = latency_ms / 1000
+        self.rate_limit = rate_limit
+        self.window_s = window_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.used = 0
+        self.requests = Counter()   # (method, endpoint, status) -> count
+        self.bytes_out = 0
+
+    # ---- rate limiting ----
+
+    def take_budget(self):
+        """Returns (allowed, headers)."""
+        with self.lock:
+            if self.error_rate and self.rng.random() < self.error_rate:
+                return False, {"X-RateLimit-Reset": str(int(time.time()) + 1)}
+            if not self.rate_limit:
+                return True, {}
+
+            now = time.time()
+            if now - self.window_start >= self.window_s:
+                self.window_start, self.used = now, 0
+            reset = self.window_start + self.window_s
+            headers = {"X-RateLimit-Limit": str(self.rate_limit), "X-RateLimit-Reset": f"{reset:.3f}"}
+            if self.used >= self.rate_limit:
+                headers["X-RateLimit-Remaining"] = "0"
+                return False, headers
+            self.used += 1
+            headers["X-RateLimit-Remaining"] = str(self.rate_limit - self.used)
+            return True, headers
+
+    def record(self, method, endpoint, status, size):
+        with self.lock:
+            self.requests[(method, endpoint, status)] += 1
+            self.bytes_out += size
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = Counter()
+            self.bytes_out = 0
+
+    # ---- endpoints ----
+
+    def list_tasks(self, query):
+        page = int(query.get("page", ["0"])[0])
+        limit = min(int(query.get("limit", [PAGE_SIZE])[0]), PAGE_SIZE)
+        tags = {unquote(t).lower() for t in query.get("tags[]", [])}
+        include_closed = query.get("include_closed", ["false"])[0] == "true"
+        updated_gt = int(query["date_updated_gt"][0]) if "date_updated_gt" in query else None
+        not_null = [f["field_id"] for f in json.loads(query.get("custom_fields", ["[]"])[0])
+                    if f.get("operator") == "IS NOT NULL"]
+
+        def matches(task):
+            if tags and not tags & {t["name"].lower() for t in task["tags"]}:
+                return False
+            if not include_closed and task["status"]["type"] == "closed":
+                return False
+            if updated_gt is not None and int(task["date_updated"]) <= updated_gt:
+                return False
+            if not_null:
+                present = {f["id"] for f in task["custom_fields"] if f.get("value") is not None}
+                if not all(fid in present for fid in not_null):
+                    return False
+            return True
+
+        # A listing starts at page 0; later pages reuse its selection so paging
+        # through a large list stays linear
+        key = (frozenset(tags), include_closed, updated_gt, tuple(not_null))
+        with self.lock:
+            if page == 0 or key not in self.listings:
+                self.listings[key] = [tid for tid in self.order if matches(self.tasks[tid])]
+            selected = self.listings[key]
+            chunk = [self.tasks[tid] for tid in selected[page * limit:(page + 1) * limit]]
+            body = json.dumps({"tasks": chunk, "last_page": (page + 1) * limit >= len(selected)})
+        return 200, body
+
+    def set_field(self, task_id, field_id, payload):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return 404, json.dumps({"err": "Task not found", "ECODE": "ITEM_013"})
+            entry = next((f for f in task["custom_fields"] if f["id"] == field_id), None)
+            if entry is None:
+                return 400, json.dumps({"err": "Field not found", "ECODE": "FIELD_033"})
+            entry["value"] = payload.get("value")
+            task["date_updated"] = str(int(time.time() * 1000))
+        return 200, "{}"
+
+    def get_task(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            body = json.dumps(task) if task else None
+        if body is None:
+            return 404, json.dumps({"err": "Task not found", "ECODE": "ITEM_013"})
+        return 200, body
+
+    def route(self, method, path, query, body):
+        """Returns (endpoint label, status, body)."""
+        if method == "GET" and re.fullmatch(r"/api/v2/list/[^/]+/field", path):
+            return "list/field", 200, json.dumps({"fields": self.fields})
+        if method == "GET" and re.fullmatch(r"/api/v2/list/[^/]+/task", path):
+            return ("list/task", *self.list_tasks(query))
+        m = re.fullmatch(r"/api/v2/task/([^/]+)/field/([^/]+)", path)
+        if method == "POST" and m:
+            return ("task/field", *self.set_field(m.group(1), m.group(2), json.loads(body or b"{}")))
+        m = re.fullmatch(r"/api/v2/task/([^/]+)", path)
+        if method == "GET" and m:
+            return ("task", *self.get_task(m.group(1)))
+        return "other", 404, json.dumps({"err": "Route not found"})
+
+# ============================
+# HTTP SERVER
+# ============================
+
+def make_handler(api):
+    class MockHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so the scripts' connection pool behaves as it would in production
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out as separate writes; don't let Nagle hold the body
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def handle_request(self, method):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+            url = urlparse(self.path)
+
+            if api.latency_s:
+                time.sleep(api.latency_s)
+
+            allowed, headers = api.take_budget()
+            if allowed:
+                endpoint, status, out = api.route(method, url.path, parse_qs(url.query), body)
+            else:
+                endpoint, status, out = "rate_limited", 429, json.dumps({"err": "Rate limit reached", "ECODE": "APP_002"})
+
+            data = out.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+            api.record(method, endpoint, status, len(data))
+
+        def do_GET(self):
+            self.handle_request("GET")
+
+        def do_POST(self):
+            self.handle_request("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+def start_server(api, port=0):
+    """
+    Serve `api` on a background thread; returns (server, base_url).
+    Port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-clickup", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v2"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic ClickUp list locally.")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per window (0 = unlimited)")
+    parser.add_argument("--window-s", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fields, tasks = synthetic_list(args.tasks, args.seed)
+    api = MockClickUp(fields, tasks, args.latency_ms, args.rate_limit, args.window_s, args.error_rate, args.seed)
+    server, base_url = start_server(api, args.port)
+    print(f"🧪 Mock ClickUp with {len(tasks)} tasks at {base_url}")
+    print(f"   export CLICKUP_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
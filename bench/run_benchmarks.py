@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Project imports (via mock_clickup) write to the state dir; never the real one
+STATE = tempfile.TemporaryDirectory(prefix="clickup-bench-")
+os.environ.setdefault("CLICKUP_STATE_DIR", STATE.name)
+
+from mock_clickup import BASE_DIR, MockClickUp, start_server, synthetic_list  # noqa: E402
+
+# ============================
+# SETTINGS
+# ============================
+
+SCRIPTS = {
+    "main": "main.py",
+    "baseline_aging": "baseline_aging.py",
+    "actual_aging": "actual_aging.py",
+    "sentiment": "sentiment.py",
+    "pipeline": "pipeline.py",
+}
+
+DEFAULT_SCRIPTS = ["main", "baseline_aging", "actual_aging", "sentiment"]
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# ============================
+# BENCHMARK
+# ============================
+
+def run_script(script, base_url, state_dir, timeout):
+    """
+    Run one script against the mock in a fresh process; returns (seconds, returncode, output tail).
+    """
+    env = dict(os.environ, CLICKUP_API_BASE=base_url, CLICKUP_STATE_DIR=state_dir, PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, SCRIPTS[script]],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    elapsed = time.perf_counter() - start
+    tail = (proc.stdout + proc.stderr).strip().splitlines()[-5:]
+    return elapsed, proc.returncode, tail
+
+def summarize(api, script, n_tasks, elapsed, returncode):
+    by_method = Counter()
+    by_status = Counter()
+    for (method, _endpoint, status), count in api.requests.items():
+        by_method[method] += count
+        by_status[status] += count
+    total = sum(by_method.values())
+    return {
+        "script": script,
+        "tasks": n_tasks,
+        "seconds": round(elapsed, 3),
+        "requests": total,
+        "gets": by_method["GET"],
+        "posts": by_method["POST"],
+        "rate_limited": by_status[429],
+        "req_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "bytes_out": api.bytes_out,
+        "returncode": returncode,
+        "endpoints": {f"{m} {e} {s}": c for (m, e, s), c in sorted(api.requests.items())},
+    }
+
+def benchmark(script, n_tasks, args):
+    # Fresh list per run so every script starts from the same unwritten data
+    fields, tasks = synthetic_list(n_tasks, args.seed)
+    api = MockClickUp(fields, tasks, args.latency_ms, args.rate_limit, args.window_s, args.error_rate, args.seed)
+    server, base_url = start_server(api)
+    try:
+        with tempfile.TemporaryDirectory(prefix="clickup-bench-") as state_dir:
+            elapsed, returncode, tail = run_script(script, base_url, state_dir, args.timeout)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if returncode:
+        print(f"❌ {script} exited with {returncode}:")
+        for line in tail:
+            print(f"   {line}")
+    return summarize(api, script, n_tasks, elapsed, returncode)
+
+def print_table(results):
+    print(f"\n{'script':<16}{'tasks':>8}{'seconds':>10}{'requests':>10}{'GET':>8}{'POST':>8}{'429':>6}{'req/s':>9}")
+    for r in results:
+        print(f"{r['script']:<16}{r['tasks']:>8}{r['seconds']:>10.2f}{r['requests']:>10}"
+              f"{r['gets']:>8}{r['posts']:>8}{r['rate_limited']:>6}{r['req_per_s']:>9.1f}")
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ClickUp scripts against a local mock API.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated task counts (e.g. 100,1000,100000)")
+    parser.add_argument("--scripts", default=",".join(DEFAULT_SCRIPTS),
+                        help=f"comma-separated, from: {', '.join(SCRIPTS)}")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every mock response")
+    parser.add_argument("--rate-limit", type=int, default=0, help="mock requests per window (0 = unlimited)")
+    parser.add_argument("--window-s", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=3600, help="per-run timeout in seconds")
+    parser.add_argument("--json", help="write results to this file (regression baseline)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    scripts = [s for s in args.scripts.split(",") if s]
+    unknown = [s for s in scripts if s not in SCRIPTS]
+    if unknown:
+        parser.error(f"unknown scripts: {', '.join(unknown)}")
+
+    results = []
+    for n_tasks in sizes:
+        for script in scripts:
+            print(f"⏱️ {script} × {n_tasks} tasks")
+            results.append(benchmark(script, n_tasks, args))
+
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Compiled calendars go to a throwaway state dir, never the real one
+STATE = tempfile.TemporaryDirectory(prefix="clickup-verify-")
+os.environ.setdefault("CLICKUP_STATE_DIR", STATE.name)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import business_calendar  # noqa: E402
+from actual_aging import WorkingDaysCalculator  # noqa: E402
+from business_calendar import BusinessCalendar, compile_calendars, parse_calendars  # noqa: E402
+from main import STAGE_OFFSETS, STAGE_ORDER  # noqa: E402
+from schedule_engine import ScheduleEngine  # noqa: E402
+
+# ============================
+# REFERENCE (the original day-by-day walks)
+# ============================
+
+def naive_count(holidays, start, end):
+    """Working days in [start, end), one day at a time (old WorkingDaysCalculator.calculate)."""
+    count = 0
+    current = start
+    while current < end:
+        if current.weekday() < 5 and current not in holidays:
+            count += 1
+        current += timedelta(days=1)
+    return count
+
+def naive_add(holidays, start, days):
+    """Old main.add_workdays on a datetime: step until `days` working days have passed."""
+    current = start
+    while days > 0:
+        current += timedelta(days=1)
+        if current.weekday() < 5 and current.date() not in holidays:
+            days -= 1
+    return current
+
+# ============================
+# CHECKS
+# ============================
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, what, got, want):
+        if got != want:
+            self.failures += 1
+            if self.failures <= 10:
+                print(f"❌ {what}: got {got!r}, want {want!r}")
+
+def random_day(rng, lo, hi):
+    return date.fromordinal(rng.randint(lo.toordinal(), hi.toordinal()))
+
+def check_calendar(check, name, cal, holidays, rng, samples):
+    """count/add/is_working_day against the day walks, inside and around the horizon."""
+    lo = date(min(holidays).year - 3, 1, 1) if holidays else date(2020, 1, 1)
+    hi = date(max(holidays).year + 3, 12, 31) if holidays else date(2030, 12, 31)
+
+    for _ in range(samples):
+        start = random_day(rng, lo, hi)
+        end = start + timedelta(days=rng.randint(-30, 800))
+        check.expect(f"{name}.count({start}, {end})", cal.count(start, end), naive_count(holidays, start, end))
+
+        days = rng.randint(0, 300)
+        want = naive_add(holidays, datetime.combine(start, datetime.min.time()), days).date()
+        check.expect(f"{name}.add({start}, {days})", cal.add(start, days), want)
+
+        check.expect(f"{name}.is_working_day({start})", cal.is_working_day(start),
+                     start.weekday() < 5 and start not in holidays)
+
+def check_index(check, name, compiled, built):
+    """A memory-mapped calendar holds exactly the index built in memory."""
+    check.expect(f"{name} horizon", (compiled.origin, compiled.end), (built.origin, built.end))
+    check.expect(f"{name} holidays", compiled.holidays, built.holidays)
+    check.expect(f"{name} cum", list(compiled.cum), list(built.cum))
+    check.expect(f"{name} workdays", list(compiled.workdays), list(built.workdays))
+
+def check_aging(check, name, cal, holidays, rng, samples):
+    """WorkingDaysCalculator.calculate_many (numpy when installed) against the day walk."""
+    lo, hi = date(2020, 1, 1), date(2032, 12, 31)
+    starts = [random_day(rng, lo, hi) for _ in range(samples)]
+    ends = [s + timedelta(days=rng.randint(-30, 800)) for s in starts]
+    got = WorkingDaysCalculator(cal).calculate_many(starts, ends)
+    for s, e, n in zip(starts, ends, got):
+        check.expect(f"{name} aging {s}..{e}", n, naive_count(holidays, s, e) if s <= e else 0)
+
+def check_schedule(check, name, cal, holidays, rng, samples):
+    """Memoized stage dates against chaining the old add_workdays stage by stage."""
+    engine = ScheduleEngine(cal, STAGE_OFFSETS, STAGE_ORDER, maxsize=64)
+    for _ in range(samples):
+        platform = rng.choice(sorted(STAGE_OFFSETS))
+        created = datetime.combine(random_day(rng, date(2022, 1, 1), date(2030, 12, 31)), datetime.min.time())
+        created += timedelta(seconds=rng.randrange(86400))
+
+        want = []
+        current = created
+        for stage in STAGE_ORDER:
+            current = naive_add(holidays, current, STAGE_OFFSETS[platform][stage])
+            want.append((stage, current))
+        check.expect(f"{name} schedule {platform} {created}", engine.stage_dates(platform, created), want)
+
+def synthetic_holidays(path, rng):
+    """The holidays file plus a random extra calendar, so more than one calendar is compiled."""
+    with open(business_calendar.HOLIDAY_FILE, "r") as f:
+        data = json.load(f)
+    days = {random_day(rng, date(2023, 1, 1), date(2029, 12, 31)).isoformat() for _ in range(120)}
+    data["calendars"] = {**(data.get("calendars") or {}), "synthetic": sorted(days)}
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the indexed and compiled calendars against day-by-day reference walks.")
+    parser.add_argument("--samples", type=int, default=5000, help="random queries per calendar")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check = Checker()
+
+    with tempfile.TemporaryDirectory(prefix="clickup-verify-") as tmp:
+        path = os.path.join(tmp, "holidays.json")
+        synthetic_holidays(path, rng)
+        with open(path, "r") as f:
+            sources = parse_calendars(json.load(f), path)
+
+        built = compile_calendars(path)      # builds and writes the compiled file
+        compiled = compile_calendars(path)   # memory-maps it back
+
+        for name, holidays in sorted(sources.items()):
+            check_index(check, name, compiled[name], BusinessCalendar(holidays))
+            check_index(check, name, built[name], compiled[name])
+            check_calendar(check, name, compiled[name], holidays, rng, args.samples)
+            check_aging(check, name, compiled[name], holidays, rng, args.samples // 4)
+            check_schedule(check, name, compiled[name], holidays, rng, args.samples // 20)
+            print(f"✅ {name}: {len(holidays)} holidays checked")
+
+    if check.failures:
+        print(f"❌ {check.failures} mismatches")
+        sys.exit(1)
+    print("✅ Calendar index, compiled calendars, batch aging and stage schedules match the reference")
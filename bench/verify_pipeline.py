@@ -0,0 +1,74 @@
+import argparse
+import copy
+import os
+import sys
+import tempfile
+
+# Compiled calendars go to a throwaway state dir, never the real one
+STATE = tempfile.TemporaryDirectory(prefix="clickup-verify-")
+os.environ.setdefault("CLICKUP_STATE_DIR", STATE.name)
+
+from mock_clickup import MockClickUp, start_server, synthetic_list  # noqa: E402
+from run_benchmarks import run_script  # noqa: E402
+
+# ============================
+# SETTINGS
+# ============================
+
+# The standalone scripts in the order the cron workflows run them
+STANDALONE = ["main", "baseline_aging", "actual_aging", "sentiment"]
+
+# ============================
+# EQUIVALENCE
+# ============================
+
+def final_values(scripts, fields, tasks, seed, timeout):
+    """Run scripts one after another against a fresh mock of the list; task id -> {field id: value}."""
+    api = MockClickUp(copy.deepcopy(fields), copy.deepcopy(tasks), seed=seed)
+    server, base_url = start_server(api)
+    try:
+        with tempfile.TemporaryDirectory(prefix="clickup-verify-") as state_dir:
+            for script in scripts:
+                _, returncode, tail = run_script(script, base_url, state_dir, timeout)
+                if returncode:
+                    print(f"❌ {script} exited with {returncode}:")
+                    for line in tail:
+                        print(f"   {line}")
+                    sys.exit(1)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        task_id: {f["id"]: f.get("value") for f in task["custom_fields"]}
+        for task_id, task in api.tasks.items()
+    }
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that pipeline.py leaves a list exactly as the four standalone scripts do.")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="per-script timeout in seconds")
+    args = parser.parse_args()
+
+    # One list for both runs (synthetic_list dates tasks from the current time)
+    fields, tasks = synthetic_list(args.tasks, args.seed)
+    scripts = final_values(STANDALONE, fields, tasks, args.seed, args.timeout)
+    pipeline = final_values(["pipeline"], fields, tasks, args.seed, args.timeout)
+
+    diffs = [
+        (task_id, field_id, values.get(field_id), pipeline[task_id].get(field_id))
+        for task_id, values in sorted(scripts.items())
+        for field_id in sorted(set(values) | set(pipeline[task_id]))
+        if values.get(field_id) != pipeline[task_id].get(field_id)
+    ]
+    for task_id, field_id, want, got in diffs[:10]:
+        print(f"❌ {task_id} {field_id}: scripts {want!r}, pipeline {got!r}")
+    if diffs:
+        print(f"❌ {len(diffs)} field values differ")
+        sys.exit(1)
+    print(f"✅ pipeline matches {' → '.join(STANDALONE)} on {len(scripts)} tasks")
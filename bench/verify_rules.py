@@ -0,0 +1,161 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Compiled calendars go to a throwaway state dir, never the real one
+STATE = tempfile.TemporaryDirectory(prefix="clickup-verify-")
+os.environ.setdefault("CLICKUP_STATE_DIR", STATE.name)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sla_rules  # noqa: E402
+from list_config import ListConfig  # noqa: E402
+from settings import cfg  # noqa: E402
+from sla_rules import ThresholdTable, baseline_option, platform_class, sentiment_options  # noqa: E402
+from task_record import TaskRecord  # noqa: E402
+
+# ============================
+# REFERENCE (the original if-chains)
+# ============================
+
+RICH_PLATFORMS = ["woo", "woocommerce", "magento", "sfcc", "big"]
+PLATFORM_TO_BASELINE = {"shopify": "9d", "rich": "21d", "custom": "35d"}
+
+def old_classify_sentiment(delta_days):
+    if delta_days is None:
+        return None
+    if delta_days >= 5:
+        return "escalated, at risk"
+    elif 0 < delta_days <= 4:
+        return "slightly delayed"
+    elif delta_days == 0:
+        return "on time"
+    elif delta_days < 0:
+        return "delivered early"
+    return None
+
+def old_resolve_platform(raw, ids_by_index, id_to_name):
+    option_id = None
+    if isinstance(raw, int) and raw < len(ids_by_index):
+        option_id = ids_by_index[raw]
+    elif isinstance(raw, str):
+        option_id = raw
+    elif isinstance(raw, list) and raw:
+        option_id = raw[0]
+
+    if option_id:
+        name = id_to_name.get(option_id, "").lower()
+        if "shopify" in name:
+            return "shopify"
+        elif any(p in name for p in RICH_PLATFORMS):
+            return "rich"
+    return "custom"
+
+# ============================
+# CHECKS
+# ============================
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, what, got, want):
+        if got != want:
+            self.failures += 1
+            if self.failures <= 10:
+                print(f"❌ {what}: got {got!r}, want {want!r}")
+
+def dropdown(field_id, names):
+    options = [{"id": f"{field_id}-{i}", "name": n, "orderindex": i} for i, n in enumerate(names)]
+    return {"id": field_id, "type": "drop_down", "type_config": {"options": options}}
+
+def make_list(rng, config=None):
+    """The configured list with synthetic platform, baseline and sentiment dropdowns."""
+    lst = ListConfig({**cfg, **(config or {})})
+    platforms = ["Shopify", "Shopify Plus", "WooCommerce", "Magento 2", "SFCC", "BigCommerce", "Custom", "Wix", ""]
+    platforms += ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(8)) for _ in range(20)]
+    fields = [
+        dropdown(lst.commerce_platform_field_id, platforms),
+        dropdown(lst.baseline_field_id, ["9d", "21d", "35d"]),
+        dropdown(lst.sentiment_field_id, ["Escalated, at risk", "Slightly delayed", "On time", "Delivered early"]),
+    ]
+    return lst.use_fields(fields), fields[0]
+
+def check_thresholds(check, rng, samples):
+    """Default sentiment table against the old chain, plus bisect against the batch lookup."""
+    table = sla_rules.SlaRules(cfg).sentiment_table()
+    for delta in range(-1000, 1001):
+        check.expect(f"classify({delta})", table.classify(delta), old_classify_sentiment(delta))
+
+    rows = [[None, "low"]] + [[b, f"from {b}"] for b in sorted(rng.sample(range(-50, 50), 12))]
+    tables = [ThresholdTable(rows), ThresholdTable(rows[1:])]
+    deltas = [rng.uniform(-80, 80) if rng.random() < 0.3 else rng.randint(-80, 80) for _ in range(samples)]
+    for t in tables:
+        check.expect("index_many", t.index_many(deltas), [t.index(d) for d in deltas])
+
+    # The bisect fallback used when numpy isn't installed
+    saved, sla_rules.np = sla_rules.np, None
+    try:
+        fallback = ThresholdTable(rows)
+    finally:
+        sla_rules.np = saved
+    check.expect("index_many without numpy", fallback.index_many(deltas), [fallback.index(d) for d in deltas])
+
+def check_platforms(check, rng, samples):
+    """Platform classes and baselines from the compiled rules against the old chains."""
+    lst, field = make_list(rng)
+    options = field["type_config"]["options"]
+    ids_by_index = [o["id"] for o in options]
+    id_to_name = {o["id"]: o["name"] for o in options}
+
+    for i in range(samples):
+        raw = rng.choice([
+            None,
+            rng.randrange(len(options) + 3),
+            rng.choice(ids_by_index),
+            [rng.choice(ids_by_index)],
+            [],
+            "unknown-option",
+        ])
+        task = TaskRecord({"id": f"t{i}", "custom_fields": [{"id": field["id"], "type": "drop_down", "value": raw}]})
+        cls = platform_class(task, lst)
+        check.expect(f"platform_class({raw!r})", cls, old_resolve_platform(raw, ids_by_index, id_to_name))
+        check.expect(f"baseline for {cls}", baseline_option(cls, lst)[0], PLATFORM_TO_BASELINE[cls])
+
+def check_per_platform(check, rng, samples):
+    """Batched sentiment options with per-platform tables against one classify per delta."""
+    lst, _ = make_list(rng, {"sentiment_thresholds": {
+        **cfg["sentiment_thresholds"],
+        "shopify": [[None, "delivered early"], [-2, "on time"], [3, "slightly delayed"], [8, "escalated, at risk"]],
+    }})
+    rules = sla_rules.rules_for(lst)
+    deltas = [rng.randint(-40, 40) for _ in range(samples)]
+    classes = [rng.choice(rules.class_names()) for _ in range(samples)]
+    resolver = lst.resolver(lst.sentiment_field_id)
+
+    for delta, cls, (label, option_id) in zip(deltas, classes, sentiment_options(deltas, classes, lst)):
+        want = rules.sentiment_table(cls).classify(delta)
+        check.expect(f"sentiment {cls} {delta}", label, want)
+        check.expect(f"sentiment option {cls} {delta}", option_id, resolver.id_for(want) if want else None)
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the compiled SLA rule tables against the original if-chains.")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check = Checker()
+    check_thresholds(check, rng, args.samples)
+    check_platforms(check, rng, args.samples)
+    check_per_platform(check, rng, args.samples)
+
+    if check.failures:
+        print(f"❌ {check.failures} mismatches")
+        sys.exit(1)
+    print("✅ Sentiment thresholds, platform classes and baselines match the reference")
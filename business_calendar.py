@@ -0,0 +1,276 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from datetime import date
+
+from settings import BASE_DIR, STATE_DIR
+
+# ============================
+# CONFIGURATION
+# ============================
+
+HOLIDAY_FILE = os.path.join(BASE_DIR, "config", "holidays.json")
+
+# Compiled calendars, one file per holidays.json content hash
+CALENDAR_DIR = os.path.join(STATE_DIR, "calendars")
+COMPILED_MAGIC = b"CUCAL01\n"
+
+# The top-level "holidays" list of holidays.json
+DEFAULT_CALENDAR = "default"
+
+# ============================
+# WEEK ARITHMETIC (outside the indexed range)
+# ============================
+
+def _weekday(ordinal):
+    # date.fromordinal(1) is a Monday
+    return (ordinal + 6) % 7
+
+def _count_weekdays(start_ord, end_ord):
+    """Mon-Fri days in [start_ord, end_ord)."""
+    if end_ord <= start_ord:
+        return 0
+    weeks, rem = divmod(end_ord - start_ord, 7)
+    count = weeks * 5
+    current = start_ord + weeks * 7
+    for _ in range(rem):
+        if _weekday(current) < 5:
+            count += 1
+        current += 1
+    return count
+
+def _add_weekdays(start_ord, days):
+    """Ordinal of the `days`-th Mon-Fri day strictly after start_ord."""
+    weeks, rem = divmod(days, 5)
+    if rem == 0 and weeks:
+        weeks, rem = weeks - 1, 5
+    current = start_ord + weeks * 7
+    while rem > 0:
+        current += 1
+        if _weekday(current) < 5:
+            rem -= 1
+    return current
+
+# ============================
+# BUSINESS CALENDAR
+# ============================
+
+class BusinessCalendar:
+    """
+    Working-day calendar backed by a cumulative index over the holiday horizon
+    (Jan 1 of the first holiday year to Dec 31 of the last):
+
+      cum[i]      -> working days in [origin, origin + i)
+      workdays[k] -> offset of the k-th working day from origin
+
+    Counting and adding working days inside the horizon are array lookups; outside
+    it no holidays are known, so plain week arithmetic gives the same answer.
+    """
+
+    def __init__(self, holidays):
+        self.holidays = set(holidays)
+
+        if self.holidays:
+            self.origin = date(min(self.holidays).year, 1, 1).toordinal()
+            self.end = date(max(self.holidays).year, 12, 31).toordinal() + 1
+        else:
+            self.origin = self.end = 0
+
+        holiday_ords = {d.toordinal() for d in self.holidays}
+        self.cum = array("i", [0])
+        self.workdays = array("i")
+        for ordinal in range(self.origin, self.end):
+            if _weekday(ordinal) < 5 and ordinal not in holiday_ords:
+                self.workdays.append(ordinal - self.origin)
+            self.cum.append(len(self.workdays))
+
+    @classmethod
+    def from_index(cls, holiday_ords, origin, end, cum, workdays):
+        """Calendar over a prebuilt index (e.g. memoryviews into a compiled file)."""
+        cal = cls.__new__(cls)
+        cal.holidays = {date.fromordinal(o) for o in holiday_ords}
+        cal.origin, cal.end = origin, end
+        cal.cum, cal.workdays = cum, workdays
+        return cal
+
+    def is_working_day(self, d):
+        return d.weekday() < 5 and d not in self.holidays
+
+    def _cum(self, ordinal):
+        """Working days in [origin, ordinal), extended with week arithmetic."""
+        if ordinal <= self.origin:
+            return -_count_weekdays(ordinal, self.origin)
+        if ordinal >= self.end:
+            return self.cum[-1] + _count_weekdays(self.end, ordinal)
+        return self.cum[ordinal - self.origin]
+
+    def count(self, start_date, end_date):
+        """Working days in [start_date, end_date)."""
+        start_ord, end_ord = start_date.toordinal(), end_date.toordinal()
+        if end_ord <= start_ord:
+            return 0
+        return self._cum(end_ord) - self._cum(start_ord)
+
+    def add(self, start_date, days):
+        """The `days`-th working day strictly after start_date (start_date if days <= 0)."""
+        if days <= 0:
+            return start_date
+
+        start_ord = start_date.toordinal()
+        if start_ord + 1 >= self.end:
+            return date.fromordinal(_add_weekdays(start_ord, days))
+
+        if start_ord + 1 < self.origin:
+            before = _count_weekdays(start_ord + 1, self.origin)
+            if days <= before:
+                return date.fromordinal(_add_weekdays(start_ord, days))
+            k = days - before - 1
+        else:
+            k = self.cum[start_ord + 1 - self.origin] + days - 1
+
+        if k < len(self.workdays):
+            return date.fromordinal(self.origin + self.workdays[k])
+
+        # Ran off the end of the index: continue with week arithmetic
+        return date.fromordinal(_add_weekdays(self.end - 1, k - len(self.workdays) + 1))
+
+# ============================
+# HOLIDAY FILE
+# ============================
+
+def parse_calendars(data, path=HOLIDAY_FILE):
+    """
+    name -> set of holiday dates. The top-level "holidays" list is the default
+    calendar; "calendars" maps further names (regions, teams) to their lists.
+    A date that doesn't parse is an error, never an empty calendar.
+    """
+    sources = {DEFAULT_CALENDAR: data.get("holidays", [])}
+    sources.update(data.get("calendars") or {})
+
+    calendars = {}
+    for name, days in sources.items():
+        try:
+            calendars[name.strip().lower()] = {date.fromisoformat(d) for d in days}
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{path}: bad holiday in calendar '{name}': {e}") from e
+    return calendars
+
+# ============================
+# COMPILED CALENDARS
+# ============================
+
+# File layout: magic, u32 header length, JSON header (padded to 4 bytes), then
+# the int32 arrays the header points at (offsets relative to the array block).
+
+def compiled_path(digest):
+    return os.path.join(CALENDAR_DIR, f"{digest[:32]}.bin")
+
+def write_compiled(path, calendars, digest):
+    header = {"source": digest, "byteorder": sys.byteorder, "calendars": {}}
+    blobs = []
+    offset = 0
+    for name, cal in calendars.items():
+        entry = {"origin": cal.origin, "end": cal.end}
+        holiday_ords = array("i", sorted(d.toordinal() for d in cal.holidays))
+        for key, values in (("holidays", holiday_ords), ("cum", cal.cum), ("workdays", cal.workdays)):
+            entry[key] = [offset, len(values)]
+            blobs.append(values.tobytes())
+            offset += len(values) * values.itemsize
+        header["calendars"][name] = entry
+
+    head = json.dumps(header).encode()
+    head += b" " * (-len(head) % 4)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(COMPILED_MAGIC + struct.pack("<I", len(head)) + head)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+
+def read_compiled(path, digest):
+    """
+    Calendars from a compiled file, memory-mapped: the index arrays are views
+    into the mapping, nothing is parsed or rebuilt. Raises ValueError if the
+    file is not a compiled form of `digest` for this machine.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mm[:len(COMPILED_MAGIC)] != COMPILED_MAGIC:
+        raise ValueError(f"{path}: not a compiled calendar")
+    (head_len,) = struct.unpack_from("<I", mm, len(COMPILED_MAGIC))
+    base = len(COMPILED_MAGIC) + 4
+    header = json.loads(mm[base:base + head_len])
+    if header["source"] != digest or header["byteorder"] != sys.byteorder:
+        raise ValueError(f"{path}: compiled for another source or platform")
+
+    view = memoryview(mm)[base + head_len:]
+
+    def ints(offset, length):
+        return view[offset:offset + length * 4].cast("i")
+
+    return {
+        name: BusinessCalendar.from_index(
+            ints(*entry["holidays"]), entry["origin"], entry["end"],
+            ints(*entry["cum"]), ints(*entry["workdays"]),
+        )
+        for name, entry in header["calendars"].items()
+    }
+
+def compile_calendars(path=HOLIDAY_FILE):
+    """
+    All calendars in a holidays file. The compiled form under state/calendars/
+    is keyed by the file's content hash: it is reused (memory-mapped) while the
+    file is unchanged and rebuilt once when it changes.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    compiled = compiled_path(digest)
+
+    try:
+        return read_compiled(compiled, digest)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    calendars = {
+        name: BusinessCalendar(days)
+        for name, days in parse_calendars(json.loads(raw), path).items()
+    }
+    try:
+        write_compiled(compiled, calendars, digest)
+    except OSError as e:
+        print(f"⚠️ Could not cache compiled calendars: {e}")
+    return calendars
+
+# ============================
+# SHARED CALENDARS
+# ============================
+
+_calendars = {}
+_lock = threading.Lock()
+
+def load_calendars(path=HOLIDAY_FILE):
+    """
+    Shared name -> calendar map per holidays file so every script reuses one index.
+    """
+    calendars = _calendars.get(path)
+    if calendars is None:
+        with _lock:
+            if path not in _calendars:
+                _calendars[path] = compile_calendars(path)
+            calendars = _calendars[path]
+    return calendars
+
+def load_calendar(path=HOLIDAY_FILE, name=DEFAULT_CALENDAR):
+    calendars = load_calendars(path)
+    if name not in calendars:
+        raise ValueError(f"Unknown calendar '{name}' (have: {', '.join(sorted(calendars))})")
+    return calendars[name]
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import time
+from datetime import date
+
+import metrics
+from checkpoint import Checkpoint
+from list_config import load_lists
+from settings import STATE_DIR
+from write_queue import FieldWrite, WriteQueue, stream_pages
+
+# ============================
+# CONFIGURATION
+# ============================
+
+PLAN_DIR = os.path.join(STATE_DIR, "plans")
+
+# ============================
+# PLAN FILE
+# ============================
+
+def plan_path(name, list_id):
+    return os.path.join(PLAN_DIR, f"{name}_{list_id}_{date.today().isoformat()}.jsonl")
+
+class PlanWriter:
+    """
+    Writes the field changes a run would make instead of sending them.
+
+    One JSON line per write: task id, field id, old and new value, plus the
+    label and field type; the POST body is kept only when it isn't
+    {"value": new}. The first line holds the list id, the plan name and when
+    it was made. apply_plan() sends the file later.
+
+    With append, an existing plan (e.g. one a restarted webhook server made
+    earlier that day) is extended instead of replaced.
+    """
+
+    def __init__(self, path, list_id, name, append=False):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.count = 0
+        self.created = time.time()
+        if append and os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, "a")
+            return
+        self._file = open(path, "w")
+        self._file.write(json.dumps({"list_id": list_id, "name": name, "created": self.created}) + "\n")
+
+    @classmethod
+    def for_today(cls, name, list_id, append=False):
+        return cls(plan_path(name, list_id), list_id, name, append)
+
+    def add(self, writes):
+        for w in writes:
+            row = {"task": w.task.id, "field": w.field_id, "old": w.previous, "new": w.value, "label": w.label}
+            if w.field_type:
+                row["type"] = w.field_type
+            if w.payload != {"value": w.value}:
+                row["payload"] = w.payload
+            self._file.write(json.dumps(row) + "\n")
+        self.count += len(writes)
+
+    def add_queue(self, queue):
+        """Move everything queued so far into the plan."""
+        self.add(queue.drain())
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        print(f"📝 Planned {self.count} field changes → {self.path}")
+
+def read_plan(path):
+    """(header, rows) from a plan file."""
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        rows = [json.loads(line) for line in f if line.strip()]
+    return header, rows
+
+def run_pages(name, list_id, pages, headers, process_page, dry_run=False, on_written=None):
+    """
+    stream_pages for a stage script: checkpointed writes, or with dry_run a
+    plan file (state/plans/<name>_<list>_<date>.jsonl) and nothing sent.
+    """
+    if dry_run:
+        plan = PlanWriter.for_today(name, list_id)
+        result = stream_pages(pages, headers, process_page, plan=plan)
+        plan.close()
+        return result
+
+    checkpoint = Checkpoint.for_today(name, list_id)
+    report, totals = stream_pages(pages, headers, process_page, checkpoint, on_written=on_written)
+    checkpoint.finish(report)
+    return report, totals
+
+# ============================
+# APPLY
+# ============================
+
+class PlannedTask:
+    """Stand-in for a TaskRecord when writes come from a plan (nothing in memory to update)."""
+    __slots__ = ("id",)
+
+    def __init__(self, task_id):
+        self.id = task_id
+
+    def set(self, field_id, value, field_type=None):
+        pass
+
+def find_list(list_id):
+    for lst in load_lists():
+        if lst.list_id == list_id:
+            return lst
+    raise RuntimeError(f"List {list_id} from the plan is not in config")
+
+def apply_plan(path):
+    """
+    Send every write in a plan through the shared write engine (bounded by
+    max_write_workers and the rate limiter). Tasks are checkpointed as their
+    writes land; if any write fails the checkpoint is kept, so applying the
+    plan again only sends what hasn't landed yet, and a clean apply removes it.
+    Each apply appends its results to <plan>.results.jsonl. Returns the
+    FlushReport.
+    """
+    header, rows = read_plan(path)
+    lst = find_list(header["list_id"])
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    checkpoint = Checkpoint(f"apply_{name}", f"{header['list_id']}:{header['created']}")
+    queue = WriteQueue(lst.headers, checkpoint)
+
+    tasks = {}
+    for row in rows:
+        task = tasks.setdefault(row["task"], PlannedTask(row["task"]))
+        if checkpoint.is_done(task.id):
+            queue.resumed += 1
+            continue
+        payload = row.get("payload") or {"value": row["new"]}
+        queue.put(FieldWrite(task, row["field"], row["new"], payload, row.get("type"), row["label"], row["old"]))
+
+    print(f"✍️ Applying {len(queue)} field changes from {path} ({queue.resumed} already written)")
+    with metrics.stage("write"):
+        report = queue.flush()
+    checkpoint.finish(report)
+    report.print_summary()
+
+    result = {
+        "plan": path,
+        "applied": time.time(),
+        "planned": len(rows),
+        "resumed": queue.resumed,
+        "written": dict(report.ok),
+        "failed": dict(report.failed),
+        "failures": [
+            {"task": w.task.id, "field": w.field_id, "new": w.value, "status": status}
+            for w, status in report.failures
+        ],
+    }
+    result_path = os.path.splitext(path)[0] + ".results.jsonl"
+    with open(result_path, "a") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"Summary: {report.written} written | {report.failed_total} failed → {result_path}")
+    return report
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a change plan written by a dry run or pipeline.py --plan.")
+    parser.add_argument("plan", help="plan file (state/plans/*.jsonl)")
+    args = parser.parse_args()
+    apply_plan(args.plan)
+    metrics.export("apply")
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from datetime import date
+
+from settings import STATE_DIR
+
+# ============================
+# CHECKPOINT
+# ============================
+
+class Checkpoint:
+    """
+    Append-only record of task ids whose writes all landed, so an interrupted
+    run can resume without resending them.
+
+    The first line of the file holds the run key (e.g. list id + date); a file
+    left by a different run is ignored and overwritten. complete() removes it
+    once a run finishes cleanly.
+    """
+
+    def __init__(self, name, run_key):
+        self.path = os.path.join(STATE_DIR, f"checkpoint_{name}.jsonl")
+        self.run_key = run_key
+        self.done = set()
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            # Header torn by a crash; treat it like another run's file
+            return
+        if not isinstance(header, dict) or header.get("run_key") != self.run_key:
+            return
+
+        for line in lines[1:]:
+            try:
+                self.done.add(json.loads(line))
+            except ValueError:
+                # Partial last line from a crash mid-write
+                break
+        print(f"♻️ Resuming from checkpoint: {len(self.done)} tasks already done")
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            if self.done:
+                self._file = open(self.path, "a")
+            else:
+                self._file = open(self.path, "w")
+                self._file.write(json.dumps({"run_key": self.run_key}) + "\n")
+        return self._file
+
+    @classmethod
+    def for_today(cls, name, list_id):
+        """Checkpoint scoped to one list and calendar day (aging moves daily)."""
+        return cls(name, f"{list_id}:{date.today().isoformat()}")
+
+    def __len__(self):
+        return len(self.done)
+
+    def is_done(self, task_id):
+        return task_id in self.done
+
+    def mark_done(self, task_id):
+        with self._lock:
+            if task_id in self.done:
+                return
+            f = self._open()
+            self.done.add(task_id)
+            f.write(json.dumps(task_id) + "\n")
+            f.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finish(self, report):
+        """Drop the checkpoint after a clean flush; keep it if any write failed."""
+        if report.failed_total:
+            self.close()
+            print(f"💾 Checkpoint kept ({len(self.done)} tasks done); rerun to resume")
+        else:
+            self.complete()
+
+    def complete(self):
+        """Run finished with no failures; the next run starts fresh."""
+        self.close()
+        self.done = set()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import get_metrics
+from settings import cfg
+
+# ============================
+# CONFIGURATION
+# ============================
+
+# CLICKUP_API_BASE points the scripts at another server (e.g. bench/mock_clickup.py)
+API_BASE = os.environ.get("CLICKUP_API_BASE") or cfg.get("api_base_url", "https://api.clickup.com/api/v2")
+
+# Enough connections for every write worker plus the reader
+POOL_SIZE = int(cfg.get("http_pool_size", max(int(cfg.get("max_write_workers", 8)), 10)))
+TIMEOUT_S = float(cfg.get("http_timeout_s", 30))
+
+# ============================
+# SESSION
+# ============================
+
+class ClickUpSession(requests.Session):
+    """
+    requests.Session with a default timeout so a stalled connection can't hang a run.
+    Every call is recorded in the run metrics (endpoint, status, latency, bytes,
+    rate-limit headroom).
+    """
+
+    def __init__(self, timeout=TIMEOUT_S):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            r = super().request(method, url, **kwargs)
+        except requests.RequestException as e:
+            get_metrics().observe_request(method.upper(), url, type(e).__name__, time.perf_counter() - start)
+            raise
+
+        body = r.request.body or b""
+        get_metrics().observe_request(
+            method.upper(), url, r.status_code, time.perf_counter() - start,
+            bytes_out=len(body), bytes_in=len(r.content), headers=r.headers,
+        )
+        return r
+
+def build_session(pool_size=POOL_SIZE, timeout=TIMEOUT_S):
+    """
+    Keep-alive session with a connection pool sized for the write workers.
+    Nothing is retried here: the write engine retries reads and writes alike
+    (429s wait for X-RateLimit-Reset, 5xx and connection errors back off), so
+    every attempt passes through ClickUpSession.request and is counted.
+    """
+    session = ClickUpSession(timeout=timeout)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Process-wide pooled session shared by every script.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
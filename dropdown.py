@@ -0,0 +1,89 @@
+import field_cache
+
+# ============================
+# DROPDOWN RESOLVER
+# ============================
+
+def normalize_label(s):
+    return (s or "").strip().lower()
+
+class DropdownResolver:
+    """
+    Index over one dropdown field definition, built once per schema:
+
+      ids_by_index -> option ids in orderindex order (ClickUp sends an int index)
+      id_to_name   -> option id -> display name
+      name_to_id   -> normalized name -> option id
+
+    resolve() accepts any of ClickUp's value shapes: int (index), str (option id)
+    or list (multi-select; first entry).
+    """
+
+    __slots__ = ("field_id", "ids_by_index", "id_to_name", "name_to_id")
+
+    def __init__(self, field_def):
+        options = (field_def.get("type_config") or {}).get("options") or []
+
+        # Label fields name their options "label" and may leave out orderindex
+        names = {o["id"]: o.get("name", o.get("label")) for o in options}
+
+        self.field_id = field_def["id"]
+        self.ids_by_index = [o["id"] for o in sorted(options, key=lambda o: o.get("orderindex", 0))]
+        self.id_to_name = names
+        self.name_to_id = {normalize_label(name): option_id for option_id, name in names.items()}
+
+    def resolve(self, value):
+        if value is None:
+            return None
+        if isinstance(value, int):
+            if 0 <= value < len(self.ids_by_index):
+                return self.ids_by_index[value]
+            return None
+        if isinstance(value, str):
+            return value
+        if isinstance(value, list) and value:
+            return value[0]
+        return None
+
+    def knows(self, value):
+        """
+        False when the options can't account for a value: an index past the
+        end or an option id not in the definition (options were added or
+        reordered in ClickUp since it was fetched).
+        """
+        if isinstance(value, bool) or value is None:
+            return True
+        if isinstance(value, int):
+            return 0 <= value < len(self.ids_by_index)
+        if isinstance(value, str):
+            return value in self.id_to_name
+        if isinstance(value, list):
+            return all(v in self.id_to_name for v in value if isinstance(v, str))
+        return True
+
+    def name_of(self, value):
+        return self.id_to_name.get(self.resolve(value), "")
+
+    def id_for(self, name):
+        return self.name_to_id.get(normalize_label(name))
+
+_resolvers = {}
+
+def find_field(fields, field_id):
+    return next((f for f in fields if f["id"] == field_id), None)
+
+def get_resolver(fields, field_id):
+    """
+    Shared resolver for a field; rebuilt only when that field's definition changes.
+    Returns None when the field is not in the list.
+    """
+    field_def = find_field(fields, field_id)
+    if field_def is None:
+        return None
+
+    digest = field_cache.schema_hash([field_def])
+    cached = _resolvers.get(field_id)
+    if cached is None or cached[0] != digest:
+        cached = (digest, DropdownResolver(field_def))
+        _resolvers[field_id] = cached
+    return cached[1]
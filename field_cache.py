@@ -0,0 +1,110 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from clickup_http import API_BASE
+from settings import STATE_DIR, cfg
+from write_engine import get_engine
+
+# ============================
+# CONFIGURATION
+# ============================
+
+CACHE_FILE = os.path.join(STATE_DIR, "field_cache.json")
+TTL_S = float(cfg.get("field_cache_ttl_s", 86400))
+
+# Lists run concurrently in pipeline.py share the one cache file
+_lock = threading.Lock()
+
+# ============================
+# CACHE FILE
+# ============================
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_cache(cache):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE_FILE)
+
+def schema_hash(fields):
+    canonical = json.dumps(sorted(fields, key=lambda f: f["id"]), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+# ============================
+# FIELD DEFINITIONS
+# ============================
+
+def fetch_fields(list_id, headers):
+    url = f"{API_BASE}/list/{list_id}/field"
+    r = get_engine().get(url, headers=headers)
+    r.raise_for_status()
+    return r.json().get("fields", [])
+
+def load_fields(list_id, headers, refresh=False, ttl=TTL_S):
+    """
+    List field definitions, served from the on-disk cache while younger than ttl.
+    Past the ttl (or with refresh) they are refetched and compared by content
+    hash; callers can check schema_hash() to rebuild derived maps only on change.
+    A task holding an option the cached definitions don't know forces a refresh
+    before the TTL (ListConfig.refresh_stale_options).
+    """
+    cache = _read_cache()
+    entry = cache.get(str(list_id))
+    now = time.time()
+
+    if entry and not refresh and now - entry["fetched_at"] < ttl:
+        return entry["fields"]
+
+    fields = fetch_fields(list_id, headers)
+    digest = schema_hash(fields)
+    if entry and entry["hash"] != digest:
+        print(f"🔁 Field schema changed for list {list_id}")
+
+    with _lock:
+        cache = _read_cache()
+        cache[str(list_id)] = {"fetched_at": now, "hash": digest, "fields": fields}
+        _write_cache(cache)
+    return fields
+
+def invalidate(list_id=None):
+    """
+    Drop the cached definitions for one list (or all lists).
+    """
+    with _lock:
+        cache = _read_cache()
+        if list_id is None:
+            cache = {}
+        else:
+            cache.pop(str(list_id), None)
+        _write_cache(cache)
+
+# ============================
+# MAIN
+# ============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or invalidate the cached ClickUp list field definitions.")
+    parser.add_argument("--invalidate", nargs="?", const="", metavar="LIST_ID",
+                        help="drop the cached definitions of LIST_ID (every list without one); "
+                             "the next run of any script refetches them")
+    args = parser.parse_args()
+
+    if args.invalidate is not None:
+        invalidate(args.invalidate or None)
+        print(f"🗑️ Field cache cleared for {args.invalidate or 'all lists'}")
+    else:
+        now = time.time()
+        for list_id, entry in sorted(_read_cache().items()):
+            age_h = (now - entry["fetched_at"]) / 3600
+            print(f"{list_id}: {len(entry['fields'])} fields | {age_h:.1f}h old | hash {entry['hash'][:12]}")
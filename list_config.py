@@ -0,0 +1,195 @@
+import time
+from urllib.parse import unquote
+
+import field_cache
+from business_calendar import DEFAULT_CALENDAR, load_calendar, load_calendars
+from dropdown import find_field, get_resolver
+from settings import cfg
+
+# ============================
+# TAGS
+# ============================
+
+def normalize_tag(tag: str) -> str:
+    """
+    Normalize a tag into its plain form for comparison:
+    Accepts raw ('new'), hashtag ('#new'), or URL-encoded ('%23new').
+    Returns 'new' for any of these.
+    """
+    if not tag:
+        return ""
+    t = tag.strip()
+    t = unquote(t)  # '%23new' -> '#new'
+    if t.startswith("#"):
+        t = t[1:]
+    return t.lower()
+
+def tag_for_api_param(tag: str) -> str:
+    """
+    Prepare the 'tags[]=' query param value.
+    If config provides URL-encoded tag (e.g., '%23new'), pass it through as-is.
+    Otherwise, encode leading '#' if present.
+    """
+    if not tag:
+        return ""
+    raw = tag.strip()
+    if "%" in raw:
+        return raw
+    raw = unquote(raw)
+    if raw.startswith("#"):
+        return "%23" + raw[1:]
+    return raw
+
+# ============================
+# LIST CONFIG
+# ============================
+
+# Field types whose task value is an option id/index rather than the text itself
+OPTION_FIELD_TYPES = ("drop_down", "labels")
+
+# Stale dropdown options trigger at most one refetch per list in this window
+FIELD_REFRESH_MIN_S = float(cfg.get("field_refresh_min_s", 300))
+
+class ListConfig:
+    """
+    One ClickUp list: its id, token, tag and field ids, plus state derived for
+    it during a run (dropdown resolvers, schedule engine) so several lists can
+    be processed side by side.
+
+    dry_run makes the stages write a change plan (change_plan.py) instead
+    of updating ClickUp.
+
+    required_tag is None when the list sets no tag (missing, null or ""): no
+    stage filters on tags then, and no tags[] is sent.
+
+    stage_field_ids / stage_offsets are None unless the list sets them; the
+    dates stage then uses its built-in FIELD_MAP / STAGE_OFFSETS.
+
+    `calendar` names the list's holiday calendar (config/holidays.json);
+    with `calendar_field_id`, a task's own value in that field (dropdown or
+    label option name, or plain text, e.g. its region) picks the calendar
+    instead.
+    """
+
+    def __init__(self, entry):
+        self.config = entry
+        self.list_id = entry["list_id"]
+        self.name = entry.get("name") or self.list_id
+        self.api_token = entry["api_token"]
+        self.required_tag = (entry.get("required_tag") or "").strip() or None
+        self.tag_plain = normalize_tag(self.required_tag)
+        self.kickoff_field_id = entry["kickoff_field_id"]
+        self.go_live_field_id = entry["go_live_field_id"]
+        self.aging_field_id = entry["aging_field_id"]
+        self.commerce_platform_field_id = entry["commerce_platform_field_id"]
+        self.baseline_field_id = entry["baseline_field_id"]
+        self.sentiment_field_id = entry["sentiment_field_id"]
+        self.actual_aging_field_id = entry["actual_aging_field_id"]
+        self.dry_run = bool(entry.get("dry_run", False))
+        self.stage_field_ids = entry.get("stage_field_ids")
+        self.stage_offsets = entry.get("stage_offsets")
+        self.calendar = (entry.get("calendar") or DEFAULT_CALENDAR).strip().lower()
+        self.calendar_field_id = entry.get("calendar_field_id")
+        load_calendar(name=self.calendar)   # unknown calendar names fail here, not mid-run
+
+        self.headers = {
+            "Authorization": self.api_token,
+            "Content-Type": "application/json",
+        }
+
+        self.fields = None
+        self.fields_refreshed_at = 0.0
+        self.cache = {}   # per-list derived state, owned by the stage modules
+
+    def __repr__(self):
+        return f"ListConfig({self.name!r}, list_id={self.list_id!r})"
+
+    def tag_query(self):
+        """`&tags[]=...` for a task query, or "" without a required tag."""
+        return f"&tags[]={tag_for_api_param(self.required_tag)}" if self.required_tag else ""
+
+    def has_required_tag(self, tag_names):
+        """Tag guard shared by every stage; True when the list has no required tag."""
+        if not self.tag_plain:
+            return True
+        return any(normalize_tag(name) == self.tag_plain for name in tag_names)
+
+    def use_fields(self, fields):
+        """Field definitions for this run; derived lookups are rebuilt from them."""
+        if fields is not self.fields:
+            self.fields = fields
+            self.cache = {k: v for k, v in self.cache.items() if not k.startswith("field:")}
+        return self
+
+    def option_field_ids(self):
+        field_ids = (self.commerce_platform_field_id, self.baseline_field_id,
+                     self.sentiment_field_id, self.calendar_field_id)
+        return [f for f in field_ids if f and self._field_type(f) in OPTION_FIELD_TYPES]
+
+    def refresh_stale_options(self, tasks):
+        """
+        Refetch the field definitions, bypassing the field cache, when a task
+        holds a dropdown value the cached options don't know. Options are
+        matched by orderindex, so an added or reordered option would otherwise
+        resolve to the wrong one until the cache expires. Call before resolving
+        (and writing) a batch; returns True when the definitions were replaced.
+        """
+        if self.fields is None or time.time() - self.fields_refreshed_at < FIELD_REFRESH_MIN_S:
+            return False
+
+        field_ids = self.option_field_ids()
+        stale = next((
+            (task.id, field_id) for task in tasks for field_id in field_ids
+            if not self.resolver(field_id).knows(task.get(field_id))
+        ), None)
+        if stale is None:
+            return False
+
+        print(f"🔁 {self.name}: task {stale[0]} has an unknown option in field {stale[1]}; refetching fields")
+        self.fields_refreshed_at = time.time()
+        self.use_fields(field_cache.load_fields(self.list_id, self.headers, refresh=True))
+        return True
+
+    def resolver(self, field_id):
+        """Dropdown resolver for one of this list's fields (None if missing)."""
+        key = f"field:{field_id}"
+        if key not in self.cache:
+            self.cache[key] = get_resolver(self.fields or [], field_id)
+        return self.cache[key]
+
+    def _field_type(self, field_id):
+        key = f"field:type:{field_id}"
+        if key not in self.cache:
+            field_def = find_field(self.fields or [], field_id)
+            self.cache[key] = field_def.get("type") if field_def else None
+        return self.cache[key]
+
+    def calendar_name(self, task):
+        """
+        Holiday calendar for a task: the one named by its calendar field when
+        that is a known calendar, else the list's.
+        """
+        if self.calendar_field_id:
+            name = task.get(self.calendar_field_id)
+            if self._field_type(self.calendar_field_id) in OPTION_FIELD_TYPES:
+                name = self.resolver(self.calendar_field_id).name_of(name)
+            if isinstance(name, str):
+                name = name.strip().lower()
+                if name in load_calendars():
+                    return name
+        return self.calendar
+
+def load_lists(config=cfg):
+    """
+    Lists to process. Each `lists` entry (name, list_id, api_token,
+    required_tag, *_field_id, stage_field_ids, stage_offsets) inherits every
+    top-level key it doesn't set; without `lists` the top-level config is the
+    single list.
+    """
+    base = {k: v for k, v in config.items() if k != "lists"}
+    entries = config.get("lists") or [{}]
+    return [ListConfig({**base, **entry}) for entry in entries]
+
+def default_list():
+    """The top-level list from config (what the single-list scripts use)."""
+    return ListConfig(cfg)
@@ -1,23 +1,40 @@
-import requests
-import json
 import os
-from datetime import datetime, timedelta
+
+import requests
+from datetime import datetime
+
+import field_cache
+import metrics
+from business_calendar import DEFAULT_CALENDAR, load_calendars
+from change_plan import run_pages
+from clickup_http import API_BASE
+from list_config import default_list, tag_for_api_param
+from page_fetcher import iter_pages
+from schedule_engine import ScheduleEngine
+from sla_rules import platform_class, rules_for
+from task_record import normalize, projector
 
 # ============================
 # CONFIGURATION
 # ============================
 
-API_TOKEN = "pk_218696006_UXYXEI6AKDLMXJ3P4INX79SD9ZO0UTF0"
-LIST_ID = "901412176234"
-TAG_FILTER = "%23new"
+# The top-level list from config/clickup_config.json
+LIST = default_list()
+LIST_ID = LIST.list_id
+TAG_FILTER = LIST.required_tag
 
-headers = {"Authorization": API_TOKEN}
+# Distinct (platform, creation day) pairs kept by the schedule engine
+SCHEDULE_CACHE_SIZE = 4096
+
+headers = LIST.headers
 
 # ============================
 # CLICKUP FIELD IDS
 # ============================
 
-FIELD_COMMERCE_PLATFORM = "4927273a-9c1f-4042-8aca-5fd4d14fa26a"
+FIELD_COMMERCE_PLATFORM = LIST.commerce_platform_field_id
+
+# Stage date fields; a list in config can override them with stage_field_ids
 
 FIELD_MAP = {
     "Kickoff": "7c302bd2-027a-4f17-b795-c3f55a044868",
@@ -34,6 +51,8 @@ STAGE_ORDER = ["Kickoff", "Design", "Integration", "PreGoLive", "QA", "GoLive"]
 # PLATFORM OFFSETS (WORKING DAYS)
 # ============================
 
+# Defaults; a list in config can override them with stage_offsets
+
 STAGE_OFFSETS = {
     "shopify": {
         "Kickoff": 2,
@@ -61,15 +80,6 @@ STAGE_OFFSETS = {
     }
 }
 
-RICH_PLATFORMS = ["woo", "woocommerce", "magento", "sfcc", "big"]
-
-# ============================
-# GLOBAL DROPDOWN MAPS
-# ============================
-
-PLATFORM_UUID_TO_NAME = {}
-PLATFORM_ID_BY_INDEX = []
-
 # ============================
 # LOAD HOLIDAYS
 # ============================
@@ -77,119 +87,156 @@ PLATFORM_ID_BY_INDEX = []
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 HOLIDAY_FILE = os.path.join(BASE_DIR, "config", "holidays.json")
 
-with open(HOLIDAY_FILE, "r") as f:
-    HOLIDAYS = {
-        datetime.strptime(d, "%Y-%m-%d").date()
-        for d in json.load(f)["holidays"]
-    }
+# Named calendars from holidays.json; tasks pick one through their list
+CALENDARS = load_calendars(HOLIDAY_FILE)
+CALENDAR = CALENDARS[DEFAULT_CALENDAR]
+HOLIDAYS = CALENDAR.holidays
 
-print(f"✅ Loaded {len(HOLIDAYS)} holidays")
+print(f"✅ Loaded {len(HOLIDAYS)} holidays ({len(CALENDARS)} calendars)")
 
 # ============================
 # DATE HELPERS
 # ============================
 
-def add_workdays(start_date, days):
-    current = start_date
-    while days > 0:
-        current += timedelta(days=1)
-        if current.weekday() < 5 and current.date() not in HOLIDAYS:
-            days -= 1
-    return current
+# Stage vectors per (platform, creation day); tasks created the same day share one
+SCHEDULE = ScheduleEngine(CALENDAR, STAGE_OFFSETS, STAGE_ORDER, maxsize=SCHEDULE_CACHE_SIZE)
+
+def stage_fields(lst):
+    return lst.stage_field_ids or FIELD_MAP
+
+def schedule_for(lst, calendar_name=None):
+    """
+    The shared SCHEDULE, or one per (list, calendar) when the list sets its own
+    stage_offsets or the task is on another calendar.
+    """
+    name = calendar_name or lst.calendar
+    if not lst.stage_offsets and name == DEFAULT_CALENDAR:
+        return SCHEDULE
+    key = f"schedule:{name}"
+    if key not in lst.cache:
+        lst.cache[key] = ScheduleEngine(
+            CALENDARS[name], lst.stage_offsets or STAGE_OFFSETS, STAGE_ORDER, maxsize=SCHEDULE_CACHE_SIZE,
+        )
+    return lst.cache[key]
 
 # ============================
 # CLICKUP HELPERS
 # ============================
 
-def fetch_field_options():
-    global PLATFORM_UUID_TO_NAME, PLATFORM_ID_BY_INDEX
+def fetch_field_options(fields=None, lst=LIST):
+    if fields is None:
+        try:
+            fields = field_cache.load_fields(lst.list_id, lst.headers)
+        except requests.RequestException:
+            return False
 
-    url = f"https://api.clickup.com/api/v2/list/{LIST_ID}/field"
-    r = requests.get(url, headers=headers)
+    lst.use_fields(fields)
 
-    if r.status_code != 200:
+    missing = [c for c in rules_for(lst).class_names() if c not in (lst.stage_offsets or STAGE_OFFSETS)]
+    if missing:
+        print(f"❌ No stage offsets for platform classes: {missing}")
         return False
-
-    fields = r.json().get("fields", [])
-    field = next(f for f in fields if f["id"] == FIELD_COMMERCE_PLATFORM)
-
-    PLATFORM_UUID_TO_NAME = {o["id"]: o["name"] for o in field["type_config"]["options"]}
-    sorted_opts = sorted(field["type_config"]["options"], key=lambda x: x["orderindex"])
-    PLATFORM_ID_BY_INDEX = [o["id"] for o in sorted_opts]
-
-    return True
-
-def get_all_tasks():
-    tasks = []
-    page = 0
-    while True:
-        url = f"https://api.clickup.com/api/v2/list/{LIST_ID}/task?page={page}&tags[]={TAG_FILTER}"
-        r = requests.get(url, headers=headers)
-        data = r.json()
-        if not data.get("tasks"):
-            break
-        tasks.extend(data["tasks"])
-        page += 1
-    return tasks
-
-def resolve_platform(task):
-    platform = "custom"
-
-    for f in task.get("custom_fields", []):
-        if f["id"] == FIELD_COMMERCE_PLATFORM:
-            raw = f.get("value")
-            option_id = None
-
-            if isinstance(raw, int) and raw < len(PLATFORM_ID_BY_INDEX):
-                option_id = PLATFORM_ID_BY_INDEX[raw]
-            elif isinstance(raw, str):
-                option_id = raw
-            elif isinstance(raw, list) and raw:
-                option_id = raw[0]
-
-            if option_id:
-                name = PLATFORM_UUID_TO_NAME.get(option_id, "").lower()
-                if "shopify" in name:
-                    platform = "shopify"
-                elif any(p in name for p in RICH_PLATFORMS):
-                    platform = "rich"
-            break
-
-    return platform
+    return lst.resolver(lst.commerce_platform_field_id) is not None
+
+def iter_task_pages(lst=LIST):
+    """Tagged tasks, one projected and normalized page at a time."""
+    url = f"{API_BASE}/list/{lst.list_id}/task"
+    if lst.required_tag:
+        url += f"?tags[]={tag_for_api_param(lst.required_tag)}"
+
+    # Everything this stage reads from a task; other fields are dropped at fetch
+    field_ids = {lst.commerce_platform_field_id, *stage_fields(lst).values()}
+    if lst.calendar_field_id:
+        field_ids.add(lst.calendar_field_id)
+    project = projector(field_ids)
+    for page in iter_pages(url, lst.headers, project=project):
+        yield normalize(page)
+
+def get_stage_values(task, lst=LIST):
+    """
+    Current stage date values (ms timestamps) keyed by field id, from the fetched task.
+    """
+    values = {}
+    for field_id in stage_fields(lst).values():
+        raw = task.get(field_id)
+        if raw not in (None, ""):
+            try:
+                values[field_id] = int(raw)
+            except (TypeError, ValueError):
+                pass
+    return values
+
+def resolve_platform(task, lst=LIST):
+    # Platform classes are configurable (sla_rules); each needs STAGE_OFFSETS
+    return platform_class(task, lst)
 
 # ============================
 # MAIN
 # ============================
 
-def run():
-    if not fetch_field_options():
-        print("❌ Failed to load platform dropdown")
-        return
-
-    tasks = get_all_tasks()
-    print(f"🔎 Processing {len(tasks)} tasks")
+def process_tasks(tasks, queue, lst=LIST):
+    """
+    Queue stage date changes; dates already holding the computed value are skipped.
+    Returns (queued, unchanged).
+    """
+    queued = unchanged = 0
+    lst.refresh_stale_options(tasks)  # before any platform is resolved
+    field_map = stage_fields(lst)
 
     for task in tasks:
-        task_id = task["id"]
-        created = datetime.fromtimestamp(int(task["date_created"]) / 1000)
+        task_id = task.id
+        created = datetime.fromtimestamp(task.date_created / 1000)
+
+        platform = resolve_platform(task, lst)
+        existing = get_stage_values(task, lst)
+        schedule = schedule_for(lst, lst.calendar_name(task))
+        writes = 0
 
-        platform = resolve_platform(task)
-        current_date = created
+        for stage, current_date in schedule.stage_dates(platform, created):
+            value = int(current_date.timestamp() * 1000)
 
-        for stage in STAGE_ORDER:
-            offset = STAGE_OFFSETS[platform][stage]
-            current_date = add_workdays(current_date, offset)
+            # Skip fields that already hold the computed date
+            if existing.get(field_map[stage]) == value:
+                unchanged += 1
+                continue
 
             payload = {
-                "value": int(current_date.timestamp() * 1000),
+                "value": value,
                 "value_options": {"time": True}
             }
 
-            url = f"https://api.clickup.com/api/v2/task/{task_id}/field/{FIELD_MAP[stage]}"
-            requests.post(url, headers=headers, json=payload)
+            if queue.add(task, field_map[stage], str(value), payload, field_type="date", label=stage):
+                writes += 1
+            else:
+                unchanged += 1
+
+        if writes:
+            print(f"✅ {task_id} | Platform: {platform} | {writes} dates queued")
+        queued += writes
+
+    return queued, unchanged
+
+def run():
+    with metrics.stage("resolve"):
+        loaded = fetch_field_options()
+    if not loaded:
+        print("❌ Failed to load platform dropdown")
+        return
+
+    # Pages are processed as they arrive and dropped once their writes land
+    report, totals = run_pages(
+        "dates", LIST_ID, iter_task_pages(), headers,
+        lambda tasks, queue: (len(tasks), *process_tasks(tasks, queue)),
+        LIST.dry_run,
+    )
+    processed, _, unchanged = totals or (0, 0, 0)
 
-        print(f"✅ {task_id} | Platform: {platform}")
+    info = SCHEDULE.cache_info()
+    print(f"🔎 Processed {processed} tasks")
+    print(f"🗓️ Schedule cache: {info.hits} reused | {info.misses} computed")
 
+    print(f"Summary: {report.written} dates written | {report.failed_total} failed | {unchanged} unchanged")
+    metrics.export("main")
     print("🎯 Completed successfully")
 
 if __name__ == "__main__":
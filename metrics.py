@@ -0,0 +1,298 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from settings import STATE_DIR, cfg
+
+# ============================
+# CONFIGURATION
+# ============================
+
+METRICS_DIR = os.path.join(STATE_DIR, "metrics")
+
+# node_exporter textfile collector directory; empty = no Prometheus export
+PROMETHEUS_DIR = cfg.get("prometheus_textfile_dir") or ""
+
+# Request latency buckets (seconds), Prometheus style
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# ============================
+# COLLECTION
+# ============================
+
+def endpoint_of(url):
+    """Collapse ids out of a ClickUp URL: /list/123/task -> list/task."""
+    path = urlparse(url).path
+    m = re.search(r"/task/[^/]+/field/[^/]+$", path)
+    if m:
+        return "task/field"
+    m = re.search(r"/(list|task|team|space|folder)/[^/]+(?:/(\w+))?$", path)
+    if m:
+        return f"{m.group(1)}/{m.group(2)}" if m.group(2) else m.group(1)
+    return path.rsplit("/", 1)[-1] or "other"
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, le in enumerate(LATENCY_BUCKETS):
+            if value <= le:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        total, out = 0, []
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q):
+        """Upper bucket bound holding the q-th observation (max beyond the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for le, n in zip(LATENCY_BUCKETS, self.cumulative()):
+            if n >= rank:
+                return le
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 4),
+            "mean_s": round(self.sum / self.count, 4) if self.count else 0.0,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "max_s": round(self.max, 4),
+            "buckets": dict(zip(map(str, LATENCY_BUCKETS), self.cumulative())),
+        }
+
+class RunMetrics:
+    """
+    Counters for one process run, filled from the HTTP session (every ClickUp
+    call) and from stage() blocks. Thread-safe; the write workers report here too.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = Counter()                 # (method, endpoint, status) -> n
+        self.latency = defaultdict(Histogram)     # "METHOD endpoint" -> Histogram
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.ratelimit_limit = None
+        self.ratelimit_remaining = None
+        self.ratelimit_min = None
+        self.stages = defaultdict(float)          # stage -> seconds (summed over repeats)
+        self.stage_calls = Counter()
+        self.lists = []                           # per-list summaries (pipeline.py)
+        self.events = Counter()                   # webhook event outcome -> n
+
+    def observe_request(self, method, url, status, seconds, bytes_out=0, bytes_in=0, headers=None):
+        endpoint = endpoint_of(url)
+        with self.lock:
+            self.requests[(method, endpoint, str(status))] += 1
+            self.latency[f"{method} {endpoint}"].observe(seconds)
+            self.bytes_out += bytes_out
+            self.bytes_in += bytes_in
+
+            if headers:
+                remaining = headers.get("X-RateLimit-Remaining")
+                limit = headers.get("X-RateLimit-Limit")
+                if limit is not None:
+                    self.ratelimit_limit = int(limit)
+                if remaining is not None:
+                    self.ratelimit_remaining = int(remaining)
+                    if self.ratelimit_min is None or self.ratelimit_remaining < self.ratelimit_min:
+                        self.ratelimit_min = self.ratelimit_remaining
+
+    def add_stage(self, name, seconds):
+        with self.lock:
+            self.stages[name] += seconds
+            self.stage_calls[name] += 1
+
+    def add_event(self, outcome):
+        with self.lock:
+            self.events[outcome] += 1
+
+    def add_list(self, summary):
+        with self.lock:
+            self.lists.append(dict(summary))
+
+    def report(self, script):
+        with self.lock:
+            return {
+                "script": script,
+                "started": self.started,
+                "duration_s": round(time.time() - self.started, 3),
+                "requests": [
+                    {"method": m, "endpoint": e, "status": s, "count": n}
+                    for (m, e, s), n in sorted(self.requests.items())
+                ],
+                "requests_total": sum(self.requests.values()),
+                "latency": {k: h.as_dict() for k, h in sorted(self.latency.items())},
+                "bytes": {"in": self.bytes_in, "out": self.bytes_out},
+                "rate_limit": {
+                    "limit": self.ratelimit_limit,
+                    "remaining_last": self.ratelimit_remaining,
+                    "remaining_min": self.ratelimit_min,
+                },
+                "stages": {
+                    name: {"seconds": round(s, 4), "calls": self.stage_calls[name]}
+                    for name, s in self.stages.items()
+                },
+                "lists": list(self.lists),
+                "events": dict(self.events),
+            }
+
+_metrics = RunMetrics()
+
+def get_metrics():
+    return _metrics
+
+@contextmanager
+def stage(name):
+    """Time a block (fetch, resolve.*, compute.*, write ...) into the run metrics."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.add_stage(name, time.perf_counter() - start)
+
+# ============================
+# EXPORT
+# ============================
+
+def _prom_labels(**labels):
+    inner = ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+def prometheus_text(report):
+    script = report["script"]
+    lines = [
+        "# HELP clickup_requests_total ClickUp API requests by endpoint and status.",
+        "# TYPE clickup_requests_total counter",
+    ]
+    for r in report["requests"]:
+        labels = _prom_labels(script=script, method=r["method"], endpoint=r["endpoint"], status=r["status"])
+        lines.append(f"clickup_requests_total{labels} {r['count']}")
+
+    lines += [
+        "# HELP clickup_request_duration_seconds ClickUp API request latency.",
+        "# TYPE clickup_request_duration_seconds histogram",
+    ]
+    for key, h in report["latency"].items():
+        method, endpoint = key.split(" ", 1)
+        for le, n in h["buckets"].items():
+            labels = _prom_labels(script=script, method=method, endpoint=endpoint, le=le)
+            lines.append(f"clickup_request_duration_seconds_bucket{labels} {n}")
+        labels = _prom_labels(script=script, method=method, endpoint=endpoint, le="+Inf")
+        lines.append(f"clickup_request_duration_seconds_bucket{labels} {h['count']}")
+        labels = _prom_labels(script=script, method=method, endpoint=endpoint)
+        lines.append(f"clickup_request_duration_seconds_sum{labels} {h['sum_s']}")
+        lines.append(f"clickup_request_duration_seconds_count{labels} {h['count']}")
+
+    lines += [
+        "# HELP clickup_bytes_total Bytes sent to / received from ClickUp.",
+        "# TYPE clickup_bytes_total gauge",
+        f"clickup_bytes_total{_prom_labels(script=script, direction='out')} {report['bytes']['out']}",
+        f"clickup_bytes_total{_prom_labels(script=script, direction='in')} {report['bytes']['in']}",
+    ]
+
+    rl = report["rate_limit"]
+    if rl["remaining_min"] is not None:
+        lines += [
+            "# HELP clickup_ratelimit_remaining_min Lowest X-RateLimit-Remaining seen this run.",
+            "# TYPE clickup_ratelimit_remaining_min gauge",
+            f"clickup_ratelimit_remaining_min{_prom_labels(script=script)} {rl['remaining_min']}",
+        ]
+
+    lines += [
+        "# HELP clickup_stage_seconds Wall time per stage.",
+        "# TYPE clickup_stage_seconds gauge",
+    ]
+    for name, s in report["stages"].items():
+        lines.append(f"clickup_stage_seconds{_prom_labels(script=script, stage=name)} {s['seconds']}")
+
+    lists = [r for r in report.get("lists", []) if "error" not in r]
+    if lists:
+        lines += [
+            "# HELP clickup_list_tasks Tasks worked on per list.",
+            "# TYPE clickup_list_tasks gauge",
+        ]
+        lines += [f"clickup_list_tasks{_prom_labels(script=script, list=r['list_id'])} {r['tasks']}" for r in lists]
+        lines += [
+            "# HELP clickup_list_writes Field writes per list by result.",
+            "# TYPE clickup_list_writes gauge",
+        ]
+        for r in lists:
+            if r.get("planned"):
+                lines.append(f"clickup_list_writes{_prom_labels(script=script, list=r['list_id'], result='planned')} {r['planned']}")
+            lines.append(f"clickup_list_writes{_prom_labels(script=script, list=r['list_id'], result='written')} {r['written']}")
+            lines.append(f"clickup_list_writes{_prom_labels(script=script, list=r['list_id'], result='failed')} {r['failed']}")
+        lines += [
+            "# HELP clickup_list_duration_seconds Wall time per list.",
+            "# TYPE clickup_list_duration_seconds gauge",
+        ]
+        lines += [f"clickup_list_duration_seconds{_prom_labels(script=script, list=r['list_id'])} {r['seconds']}" for r in lists]
+
+    if report.get("events"):
+        lines += [
+            "# HELP clickup_webhook_events_total Webhook events by outcome (processed, retried, dropped).",
+            "# TYPE clickup_webhook_events_total counter",
+        ]
+        lines += [
+            f"clickup_webhook_events_total{_prom_labels(script=script, result=outcome)} {n}"
+            for outcome, n in sorted(report["events"].items())
+        ]
+
+    lines += [
+        "# HELP clickup_run_duration_seconds Wall time of the whole run.",
+        "# TYPE clickup_run_duration_seconds gauge",
+        f"clickup_run_duration_seconds{_prom_labels(script=script)} {report['duration_s']}",
+        "# HELP clickup_run_timestamp_seconds When the run started.",
+        "# TYPE clickup_run_timestamp_seconds gauge",
+        f"clickup_run_timestamp_seconds{_prom_labels(script=script)} {report['started']:.0f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+def _write_atomic(path, text):
+    # The textfile collector may read at any moment; never expose a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def export(script):
+    """
+    Write this run's metrics to state/metrics/<script>.json and, when
+    prometheus_textfile_dir is set, clickup_<script>.prom there.
+    """
+    report = _metrics.report(script)
+
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    json_path = os.path.join(METRICS_DIR, f"{script}.json")
+    _write_atomic(json_path, json.dumps(report, indent=2))
+
+    if PROMETHEUS_DIR:
+        os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+        _write_atomic(os.path.join(PROMETHEUS_DIR, f"clickup_{script}.prom"), prometheus_text(report))
+
+    stages = " | ".join(f"{name} {s['seconds']:.2f}s" for name, s in report["stages"].items())
+    print(f"📊 {report['requests_total']} requests in {report['duration_s']:.1f}s ({stages}) → {json_path}")
+    return report
@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from settings import cfg
+from write_engine import get_engine
+
+# ============================
+# CONFIGURATION
+# ============================
+
+# Pages requested ahead of the one being consumed
+PAGE_WINDOW = max(1, int(cfg.get("page_fetch_window", 4)))
+
+# requests is blocking, so each page GET runs on a reader thread
+_readers = ThreadPoolExecutor(max_workers=PAGE_WINDOW, thread_name_prefix="clickup-read")
+
+# ============================
+# PAGE FETCHING
+# ============================
+
+def page_url(url, page):
+    return f"{url}{'&' if '?' in url else '?'}page={page}"
+
+def get_page(url, headers, page, project=None):
+    """
+    One blocking page GET, counted against the same rate budget as the writes
+    (a 429 waits for the rate-limit reset instead of failing the run).
+    With `project`, tasks are slimmed on the reader thread so the raw page JSON
+    is released before the page is queued.
+    """
+    r = get_engine().get(page_url(url, page), headers=headers)
+    r.raise_for_status()
+    data = r.json()
+    if project is not None:
+        data["tasks"] = [project(t) for t in data.get("tasks") or []]
+    return data
+
+async def aiter_pages(url, headers, window=PAGE_WINDOW, project=None):
+    """
+    Async generator over the task pages of a list query (`url` without `page`).
+
+    Keeps `window` page requests in flight and yields each page's tasks in page
+    order as soon as it arrives. Stops at ClickUp's `last_page` flag (or an empty
+    page); requests speculatively sent past the end are discarded. Tasks are
+    passed through `project` (e.g. task_record.projector) when given.
+    """
+    loop = asyncio.get_running_loop()
+    inflight = {}
+    next_page = 0
+
+    def launch():
+        nonlocal next_page
+        inflight[next_page] = loop.run_in_executor(_readers, get_page, url, headers, next_page, project)
+        next_page += 1
+
+    for _ in range(window):
+        launch()
+
+    page = 0
+    try:
+        while True:
+            data = await inflight.pop(page)
+            tasks = data.get("tasks") or []
+            if not tasks:
+                return
+            yield tasks
+            if data.get("last_page"):
+                return
+            page += 1
+            launch()
+    finally:
+        for future in inflight.values():
+            future.cancel()
+
+def iter_pages(url, headers, window=PAGE_WINDOW, project=None):
+    """
+    Blocking wrapper around aiter_pages for the synchronous scripts; the window
+    keeps downloading while the caller processes a page.
+    """
+    loop = asyncio.new_event_loop()
+    pages = aiter_pages(url, headers, window, project)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(pages.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(pages.aclose())
+        loop.close()
+
+def fetch_all(url, headers, window=PAGE_WINDOW, project=None):
+    tasks = []
+    for page in iter_pages(url, headers, window, project):
+        tasks.extend(page)
+    return tasks
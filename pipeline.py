@@ -0,0 +1,301 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import main as dates_stage
+import baseline_aging
+import actual_aging
+import sentiment
+
+import field_cache
+import metrics
+import task_sync
+from aging_history import HistoryWriter
+from change_plan import PlanWriter
+from checkpoint import Checkpoint
+from clickup_http import API_BASE
+from list_config import default_list, load_lists
+from page_fetcher import fetch_all
+from settings import cfg
+from task_record import normalize, project
+from task_store import get_store
+from write_engine import get_engine
+from write_queue import FlushReport, WriteQueue
+
+# ============================
+# CONFIGURATION
+# ============================
+
+INCREMENTAL_SYNC = bool(cfg.get("incremental_sync", False))
+
+# Lists processed side by side; they share the HTTP pool and the rate budget
+MAX_LIST_WORKERS = max(1, int(cfg.get("max_list_workers", 4)))
+
+# The top-level list from config (the webhook and single-list callers use it)
+LIST = default_list()
+LIST_ID = LIST.list_id
+REQUIRED_TAG = LIST.required_tag
+
+HEADERS = LIST.headers
+
+# ============================
+# CLICKUP HELPERS
+# ============================
+
+def fetch_fields(refresh=False, lst=LIST):
+    return field_cache.load_fields(lst.list_id, lst.headers, refresh=refresh)
+
+def get_all_tasks(updated_gt=None, lst=LIST):
+    """
+    Fetch every tagged task (open and closed) once; each stage filters
+    the shared in-memory set down to the tasks it cares about.
+    With updated_gt (ms), fetch only tasks changed since then, tagged or not,
+    so the incremental sync can also drop tasks that lost the tag.
+    """
+    url = f"{API_BASE}/list/{lst.list_id}/task?include_closed=true"
+    if updated_gt is not None:
+        url += f"&date_updated_gt={updated_gt}"
+    else:
+        url += lst.tag_query()
+
+    # Stages read every custom field value, so only the payload around them is dropped
+    return fetch_all(url, lst.headers, project=project)
+
+def get_task(task_id, lst=LIST):
+    """The task, projected; None when it belongs to another list."""
+    url = f"{API_BASE}/task/{task_id}"
+    r = get_engine().get(url, headers=lst.headers)
+    r.raise_for_status()
+    task = r.json()
+    if str((task.get("list") or {}).get("id")) != str(lst.list_id):
+        return None
+    return project(task)
+
+def has_required_tag(task, lst=LIST):
+    """Tag guard for raw task dicts (before they are normalized)."""
+    return lst.has_required_tag(t.get("name") or "" for t in task.get("tags", []))
+
+def is_closed(task):
+    return task.status_type == "closed"
+
+# ============================
+# STAGES
+# ============================
+
+def run_dates(tasks, fields, queue, lst=LIST):
+    with metrics.stage("resolve.dates"):
+        loaded = dates_stage.fetch_field_options(fields, lst)
+    if not loaded:
+        print("❌ Failed to load platform dropdown")
+        return
+
+    # main.py only ever looked at open tasks
+    open_tasks = [t for t in tasks if not is_closed(t)]
+    print(f"📅 Dates: {len(open_tasks)} tasks")
+    with metrics.stage("compute.dates"):
+        queued, unchanged = dates_stage.process_tasks(open_tasks, queue, lst)
+    print(f"Dates: {queued} queued | {unchanged} unchanged")
+
+def run_baseline(tasks, fields, queue, lst=LIST):
+    with metrics.stage("resolve.baseline"):
+        baseline_aging.fetch_dropdowns(fields, lst)
+
+    print(f"📏 Baseline: {len(tasks)} tasks")
+    with metrics.stage("compute.baseline"):
+        queued, skipped = baseline_aging.process_tasks(tasks, queue, lst)
+    print(f"Baseline: {queued} queued | {skipped} skipped")
+
+def run_aging(tasks, queue, lst=LIST):
+    client = actual_aging.ClickUpClient(lst.config, lst)
+
+    kickoff_tasks = [
+        t for t in tasks
+        if client.get_custom_field(t, client.kickoff_field_id) is not None
+    ]
+    print(f"⏱ Aging: {len(kickoff_tasks)} tasks with kickoff date set")
+    with metrics.stage("compute.aging"):
+        queued, skipped = actual_aging.process_tasks(client, kickoff_tasks, queue)
+    print(f"Aging: {queued} queued | {skipped} skipped")
+
+def run_sentiment(tasks, fields, queue, lst=LIST):
+    with metrics.stage("resolve.sentiment"):
+        sentiment.fetch_dropdowns(fields, lst)
+
+    # Same filter sentiment.py applies server-side, evaluated after aging/baseline landed
+    ready = [
+        t for t in tasks
+        if sentiment.get_field_value(t, lst.actual_aging_field_id) is not None
+        and sentiment.get_field_value(t, lst.baseline_field_id) is not None
+    ]
+    print(f"💬 Sentiment: {len(ready)} tasks")
+    with metrics.stage("compute.sentiment"):
+        queued, skipped, missing_data = sentiment.process_tasks(ready, queue, lst)
+    print(f"Sentiment: {queued} queued | {skipped} skipped | {missing_data} missing data")
+
+def run_stages(tasks, fields, checkpoint=None, lst=LIST, plan=None, history=None):
+    # Normalize once; stages read field values from the records and write
+    # their updates through to the raw task dicts
+    with metrics.stage("normalize"):
+        tasks = normalize(tasks)
+
+    # Every stage resolves from the same definitions; refetch them up front
+    # if a task holds an option the cached ones don't know
+    if lst.use_fields(fields).refresh_stale_options(tasks):
+        fields = lst.fields
+
+    # Order matters: aging and baseline must land (in memory) before sentiment
+    # reads them; the queue applies values immediately and writes them at the end
+    queue = WriteQueue(lst.headers, checkpoint)
+    run_dates(tasks, fields, queue, lst)
+    run_baseline(tasks, fields, queue, lst)
+    run_aging(tasks, queue, lst)
+    run_sentiment(tasks, fields, queue, lst)
+
+    if plan is not None:
+        print(f"\n📝 Planning {len(queue)} field changes ({queue.dropped} no-ops dropped)")
+        with metrics.stage("plan"):
+            plan.add_queue(queue)
+        return FlushReport()
+
+    print(f"\n✍️ Writing {len(queue)} field changes ({queue.dropped} no-ops dropped, {queue.resumed} already written)")
+    with metrics.stage("write"):
+        report = queue.flush()
+    report.print_summary()
+
+    # Failed writes were rolled back, so this is what ClickUp now holds
+    if history is not None:
+        with metrics.stage("history"):
+            history.add(tasks, lst)
+    return report
+
+# ============================
+# MAIN
+# ============================
+
+def run_list(lst, full_resync=False, offline=False, refresh_fields=False, plan=None, history=None):
+    """
+    Fetch, compute and write one list (or, with plan, write its change plan;
+    plan=None follows the list's dry_run). Returns its summary for the run
+    report (None when there was nothing to work from).
+    """
+    if plan is None:
+        plan = lst.dry_run
+    start = time.perf_counter()
+    store = get_store(lst.list_id)
+    snapshot = None
+
+    if offline:
+        # Compute against the local snapshot only; nothing is read from ClickUp
+        fields = store.load_fields()
+        if not fields or not store.count_tasks():
+            print(f"❌ {lst.name}: no snapshot yet; run once without --offline")
+            return None
+        snapshot = store.load_tasks()
+        tasks = list(snapshot.values())
+    else:
+        with metrics.stage("fetch"):
+            fields = fetch_fields(refresh=refresh_fields, lst=lst)
+            store.save_fields(fields)
+
+            if INCREMENTAL_SYNC:
+                snapshot = task_sync.sync_tasks(
+                    partial(get_all_tasks, lst=lst), partial(has_required_tag, lst=lst),
+                    force_full=full_resync, store=store,
+                )
+                tasks = list(snapshot.values())
+            else:
+                # No watermark to keep, but --offline still needs the snapshot
+                tasks = get_all_tasks(lst=lst)
+                store.replace_tasks(tasks)
+                snapshot = tasks
+    print(f"🔎 {lst.name}: working on {len(tasks)} tasks and {len(fields)} fields")
+
+    if plan:
+        # Nothing is sent, so there is nothing to checkpoint
+        writer = PlanWriter.for_today("pipeline", lst.list_id)
+        report = run_stages(tasks, fields, lst=lst, plan=writer)
+        writer.close()
+    else:
+        # The configured list keeps its checkpoint file; the others get one each
+        name = "pipeline" if lst.list_id == LIST_ID else f"pipeline_{lst.list_id}"
+        checkpoint = Checkpoint.for_today(name, lst.list_id)
+        report = run_stages(tasks, fields, checkpoint, lst, history=history)
+        checkpoint.finish(report)
+
+    # Stages wrote their updates through to the task dicts; keep the snapshot
+    # current (a plan hasn't changed anything in ClickUp yet)
+    if snapshot is not None and not plan:
+        with metrics.stage("snapshot"):
+            task_sync.save_snapshot(tasks, store)
+
+    return {
+        "list": lst.name,
+        "list_id": lst.list_id,
+        "tasks": len(tasks),
+        "planned": writer.count if plan else 0,
+        "written": report.written,
+        "failed": report.failed_total,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+def print_list_reports(results):
+    print(f"\n{'list':<24}{'tasks':>8}{'planned':>9}{'written':>10}{'failed':>8}{'seconds':>10}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['list']:<24}  ❌ {r['error']}")
+            continue
+        print(f"{r['list']:<24}{r['tasks']:>8}{r['planned']:>9}{r['written']:>10}{r['failed']:>8}{r['seconds']:>10.2f}")
+
+def run(full_resync=False, offline=False, refresh_fields=False, plan=None):
+    lists = load_lists()
+
+    # Today's aging snapshot of every list that writes, appended once at the end
+    planning = all(lst.dry_run for lst in lists) if plan is None else plan
+    history = None if planning else HistoryWriter()
+    options = dict(full_resync=full_resync, offline=offline, refresh_fields=refresh_fields, plan=plan, history=history)
+
+    if len(lists) == 1:
+        results = [run_list(lists[0], **options)]
+    else:
+        print(f"🗂️ Running {len(lists)} lists ({min(MAX_LIST_WORKERS, len(lists))} at a time)")
+        with ThreadPoolExecutor(max_workers=MAX_LIST_WORKERS, thread_name_prefix="clickup-list") as pool:
+            futures = [pool.submit(run_list, lst, **options) for lst in lists]
+        results = []
+        for lst, future in zip(lists, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # One broken list (bad token, missing field) doesn't stop the others
+                print(f"❌ {lst.name} failed: {e}")
+                results.append({"list": lst.name, "list_id": lst.list_id, "error": str(e)})
+
+    if history is not None:
+        with metrics.stage("history"):
+            history.close()
+
+    reports = [r for r in results if r]
+    for r in reports:
+        metrics.get_metrics().add_list(r)
+    if len(lists) > 1:
+        print_list_reports(reports)
+
+    print("\n" + "=" * 60)
+    print("🎯 Pipeline completed")
+    print("=" * 60)
+    metrics.export("pipeline")
+
+    # An offline run with no snapshot to work from did nothing; don't report success
+    if offline and None in results:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all ClickUp update stages from one task fetch.")
+    parser.add_argument("--full-resync", action="store_true", help="ignore the sync watermark and refetch the whole list")
+    parser.add_argument("--offline", action="store_true", help="compute from the local snapshot without fetching from ClickUp")
+    parser.add_argument("--refresh-fields", action="store_true", help="refetch list field definitions even if the cache is fresh")
+    parser.add_argument("--plan", action=argparse.BooleanOptionalAction, default=None,
+                        help="write each list's changes to state/plans/ for change_plan.py instead of sending them "
+                             "(default: each list's dry_run; --no-plan sends them even with dry_run set)")
+    args = parser.parse_args()
+    run(full_resync=args.full_resync, offline=args.offline, refresh_fields=args.refresh_fields, plan=args.plan)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from functools import lru_cache
+
+# ============================
+# SCHEDULE ENGINE
+# ============================
+
+class ScheduleEngine:
+    """
+    Stage dates for a task from its platform and creation time.
+
+    The chain of working-day additions only depends on (platform, creation day),
+    so the per-stage offsets in calendar days are computed once per pair and kept
+    in a bounded LRU. Each task then only adds those offsets to its own creation
+    datetime, which keeps its time of day.
+    """
+
+    def __init__(self, calendar, stage_offsets, stage_order, maxsize=4096):
+        self.calendar = calendar
+        self.stage_offsets = stage_offsets
+        self.stage_order = tuple(stage_order)
+        self.day_offsets = lru_cache(maxsize=maxsize)(self._day_offsets)
+
+    def _day_offsets(self, platform, day):
+        offsets = self.stage_offsets[platform]
+        current = day
+        out = []
+        for stage in self.stage_order:
+            current = self.calendar.add(current, offsets[stage])
+            out.append((current - day).days)
+        return tuple(out)
+
+    def stage_dates(self, platform, created):
+        """[(stage, datetime)] in stage order for a task created at `created`."""
+        offsets = self.day_offsets(platform, created.date())
+        return [(stage, created + timedelta(days=d)) for stage, d in zip(self.stage_order, offsets)]
+
+    def cache_info(self):
+        return self.day_offsets.cache_info()
@@ -1,102 +1,34 @@
 
-import requests
 import json
-import os
 import re
-import time
 import urllib.parse
-from urllib.parse import unquote
 
-# ============================
-# LOAD CONFIG
-# ============================
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_PATH = os.path.join(BASE_DIR, "config", "clickup_config.json")
-
-with open(CONFIG_PATH, "r") as f:
-    cfg = json.load(f)
-
-API_TOKEN = cfg["api_token"]
-LIST_ID = cfg["list_id"]
-FIELD_SENTIMENT = cfg["sentiment_field_id"]          # dropdown: sentiment - delivery
-FIELD_ACTUAL = cfg["actual_aging_field_id"]          # text: actual aging
-FIELD_BASELINE = cfg["baseline_field_id"]            # dropdown: baseline aging
-REQUIRED_TAG = cfg.get("required_tag")               # e.g., "%23new"
-DRY_RUN = bool(cfg.get("dry_run", False))
-PAUSE_MS = int(cfg.get("pause_ms_between_updates", 0))
-
-HEADERS = {
-    "Authorization": API_TOKEN,
-    "Content-Type": "application/json"
-}
+import field_cache
+import metrics
+from change_plan import run_pages
+from clickup_http import API_BASE
+from list_config import default_list
+from page_fetcher import iter_pages
+from sla_rules import platform_class, rules_for, sentiment_options
+from task_record import normalize, projector
 
 # ============================
-# DROPDOWN MAPS
+# CONFIGURATION
 # ============================
 
-# Baseline dropdown mappings
-BASELINE_ID_TO_NAME = {}
-BASELINE_NAME_TO_ID = {}
-BASELINE_ID_TO_DAYS = {}
+LIST = default_list()
+LIST_ID = LIST.list_id
+FIELD_SENTIMENT = LIST.sentiment_field_id            # dropdown: sentiment - delivery
+FIELD_ACTUAL = LIST.actual_aging_field_id            # text: actual aging
+FIELD_BASELINE = LIST.baseline_field_id              # dropdown: baseline aging
+REQUIRED_TAG = LIST.required_tag                     # e.g., "%23new"
 
-# Sentiment dropdown mappings
-SENTIMENT_NAME_TO_ID = {}
-SENTIMENT_ID_TO_NAME = {}
-
-# Target sentiment labels expected in ClickUp dropdown
-SENTIMENT_LABELS = {
-    "escalated, at risk": "escalated, at risk",
-    "slightly delayed": "slightly delayed",
-    "on time": "on time",
-    "delivered early": "delivered early",
-}
+HEADERS = LIST.headers
 
 # ============================
 # HELPERS
 # ============================
 
-def normalize_label(s: str) -> str:
-    return (s or "").strip().lower()
-
-def normalize_tag(tag: str) -> str:
-    """
-    Normalize a tag into its plain form for comparison:
-    Accepts raw ('new'), hashtag ('#new'), or URL-encoded ('%23new').
-    Returns 'new' for any of these.
-    """
-    if not tag:
-        return ""
-    t = tag.strip()
-    t = unquote(t)  # '%23new' -> '#new'
-    if t.startswith("#"):
-        t = t[1:]
-    return t.lower()
-
-def tag_for_api_param(tag: str) -> str:
-    """
-    Prepare the 'tags[]=' query param value.
-    If config provides URL-encoded tag (e.g., '%23new'), pass it through as-is.
-    Otherwise, encode leading '#' if present.
-    """
-    if not tag:
-        return ""
-    raw = tag.strip()
-    if "%" in raw:
-        return raw
-    raw = unquote(raw)
-    if raw.startswith("#"):
-        return "%23" + raw[1:]
-    return raw
-
-def task_has_tag(task, tag_plain: str) -> bool:
-    """Client-side guard: ensure the task truly has the tag (case-insensitive)."""
-    if not tag_plain:
-        return True
-    target = normalize_tag(tag_plain)
-    tags = task.get("tags", [])
-    return any(normalize_tag(t.get("name", "")) == target for t in tags)
-
 def parse_days_from_text(raw: str):
     """
     Parse 'Actual Aging' text into integer days.
@@ -128,141 +60,99 @@ def parse_days_from_baseline_name(name: str):
     m = re.search(r"(-?\d+)", name.strip().lower())
     return int(m.group(1)) if m else None
 
-def resolve_dropdown_value(field_value, options):
-    """
-    Resolve ClickUp dropdown 'value' to an option_id.
-    'value' can be int (index), str (id), or list (multi-select; take first).
-    """
-    if field_value is None:
-        return None
-
-    if isinstance(field_value, int):
-        sorted_opts = [o["id"] for o in sorted(options, key=lambda x: x["orderindex"])]
-        if 0 <= field_value < len(sorted_opts):
-            return sorted_opts[field_value]
-        return None
-    if isinstance(field_value, str):
-        return field_value
-    if isinstance(field_value, list) and field_value:
-        return field_value[0]
-    return None
-
 # ============================
 # CLICKUP HELPERS
 # ============================
 
-def fetch_dropdowns():
+def fetch_fields(lst=LIST):
+    """
+    The list's custom field definitions (served from the shared field cache).
+    """
+    return field_cache.load_fields(lst.list_id, lst.headers)
+
+def fetch_dropdowns(fields=None, lst=LIST):
     """
-    Fetch list fields and initialize baseline & sentiment dropdown maps.
+    Initialize baseline & sentiment dropdown maps from the list fields
+    (fetched from ClickUp when not provided).
     """
-    url = f"https://api.clickup.com/api/v2/list/{LIST_ID}/field"
-    r = requests.get(url, headers=HEADERS)
-    r.raise_for_status()
-
-    fields = r.json().get("fields", [])
-
-    # Baseline dropdown
-    baseline_field = next((f for f in fields if f["id"] == FIELD_BASELINE), None)
-    if not baseline_field:
-        raise RuntimeError(f"Baseline field id not found: {FIELD_BASELINE}")
-    baseline_opts = baseline_field["type_config"]["options"]
-    for o in baseline_opts:
-        oid = o["id"]
-        name = o["name"]
-        BASELINE_ID_TO_NAME[oid] = name
-        BASELINE_NAME_TO_ID[normalize_label(name)] = oid
-        BASELINE_ID_TO_DAYS[oid] = parse_days_from_baseline_name(name)
+    if fields is None:
+        fields = fetch_fields(lst)
+    lst.use_fields(fields)
+
+    # Baseline dropdown + option id -> days
+    baseline_dropdown = lst.resolver(lst.baseline_field_id)
+    if not baseline_dropdown:
+        raise RuntimeError(f"Baseline field id not found: {lst.baseline_field_id}")
+    lst.cache["field:baseline_days"] = {
+        oid: parse_days_from_baseline_name(name)
+        for oid, name in baseline_dropdown.id_to_name.items()
+    }
 
     # Sentiment dropdown
-    sentiment_field = next((f for f in fields if f["id"] == FIELD_SENTIMENT), None)
-    if not sentiment_field:
-        raise RuntimeError(f"Sentiment field id not found: {FIELD_SENTIMENT}")
-    sentiment_opts = sentiment_field["type_config"]["options"]
-    for o in sentiment_opts:
-        oid = o["id"]
-        name = o["name"]
-        SENTIMENT_ID_TO_NAME[oid] = name
-        SENTIMENT_NAME_TO_ID[normalize_label(name)] = oid
-
-    # Validate required sentiment labels exist
+    sentiment_dropdown = lst.resolver(lst.sentiment_field_id)
+    if not sentiment_dropdown:
+        raise RuntimeError(f"Sentiment field id not found: {lst.sentiment_field_id}")
+
+    # Validate the labels used by the sentiment thresholds exist
     missing = [
-        lbl for lbl in SENTIMENT_LABELS.values()
-        if normalize_label(lbl) not in SENTIMENT_NAME_TO_ID
+        lbl for lbl in rules_for(lst).sentiment_labels()
+        if sentiment_dropdown.id_for(lbl) is None
     ]
     if missing:
         print("⚠️ Missing sentiment dropdown options in ClickUp:", missing)
-        print("   Please add these options or adjust SENTIMENT_LABELS to match your field.")
+        print("   Please add these options or adjust sentiment_thresholds in config to match your field.")
     else:
         print("✅ Sentiment dropdown options resolved.")
 
-def get_all_tasks():
+def iter_task_pages(lst=LIST):
     """
     Fetch tasks from the list, filtered server-side:
       - tag == '#new' (config as '%23new')
       - Actual Aging IS NOT NULL
       - Baseline Aging IS NOT NULL
-    Uses pagination until no more tasks.
+    Yields one projected and normalized page at a time (fetched concurrently,
+    see page_fetcher).
     """
-    tasks = []
-    page = 0
-
-    tag_param = tag_for_api_param(REQUIRED_TAG) if REQUIRED_TAG else None
-
     # Build the custom_fields filter array and stringify for query param
     cf_filters = [
-        {"field_id": FIELD_ACTUAL,   "operator": "IS NOT NULL"},
-        {"field_id": FIELD_BASELINE, "operator": "IS NOT NULL"},
+        {"field_id": lst.actual_aging_field_id, "operator": "IS NOT NULL"},
+        {"field_id": lst.baseline_field_id,     "operator": "IS NOT NULL"},
     ]
     cf_param = urllib.parse.quote(json.dumps(cf_filters))
 
-    while True:
-        url = (
-            f"https://api.clickup.com/api/v2/list/{LIST_ID}/task"
-            f"?page={page}"
-            f"&include_closed=true"
-            f"&limit=100"
-        )
-        if tag_param:
-            url += f"&tags[]={tag_param}"
-        url += f"&custom_fields={cf_param}"
-
-        r = requests.get(url, headers=HEADERS)
-        r.raise_for_status()
-        data = r.json()
-
-        page_tasks = data.get("tasks", [])
-        if not page_tasks:
-            break
-
-        tasks.extend(page_tasks)
-        page += 1
-
-    return tasks
+    url = (
+        f"{API_BASE}/list/{lst.list_id}/task"
+        f"?include_closed=true"
+        f"&limit=100"
+    )
+    url += lst.tag_query()
+    url += f"&custom_fields={cf_param}"
+
+    field_ids = {lst.actual_aging_field_id, lst.baseline_field_id, lst.sentiment_field_id}
+    if rules_for(lst).per_platform_sentiment():
+        field_ids.add(lst.commerce_platform_field_id)
+    project = projector(field_ids)
+    for page in iter_pages(url, lst.headers, project=project):
+        yield normalize(page)
 
 def get_field_value(task, field_id):
-    for f in task.get("custom_fields", []):
-        if f["id"] == field_id:
-            return f.get("value"), f
-    return None, None
+    return task.get(field_id)
 
-def get_actual_days(task):
-    raw_val, _ = get_field_value(task, FIELD_ACTUAL)
+def get_actual_days(task, lst=LIST):
+    raw_val = get_field_value(task, lst.actual_aging_field_id)
     return parse_days_from_text(raw_val)
 
-def get_baseline_days(task, baseline_field_def):
-    raw_val, _ = get_field_value(task, FIELD_BASELINE)
-    option_id = resolve_dropdown_value(raw_val, baseline_field_def["type_config"]["options"])
-    if option_id and option_id in BASELINE_ID_TO_DAYS:
-        return BASELINE_ID_TO_DAYS[option_id]
-    return None
+def get_baseline_days(task, lst=LIST):
+    option_id = lst.resolver(lst.baseline_field_id).resolve(get_field_value(task, lst.baseline_field_id))
+    return lst.cache["field:baseline_days"].get(option_id)
 
-def get_current_sentiment_option_id(task, sentiment_field_def):
-    raw_val, _ = get_field_value(task, FIELD_SENTIMENT)
-    return resolve_dropdown_value(raw_val, sentiment_field_def["type_config"]["options"])
+def get_current_sentiment_option_id(task, lst=LIST):
+    return lst.resolver(lst.sentiment_field_id).resolve(get_field_value(task, lst.sentiment_field_id))
 
-def classify_sentiment(delta_days):
+def classify_sentiment(delta_days, platform=None, lst=LIST):
     """
-    Map delta (actual - baseline) to sentiment:
+    Map delta (actual - baseline) to a sentiment label with the platform's
+    thresholds (sentiment_thresholds in config; by default):
       >= 5d  -> escalated, at risk
       0d<Δ<=4d -> slightly delayed
       Δ==0d -> on time
@@ -270,106 +160,93 @@ def classify_sentiment(delta_days):
     """
     if delta_days is None:
         return None
-    if delta_days >= 5:
-        return SENTIMENT_LABELS["escalated, at risk"]
-    elif 0 < delta_days <= 4:
-        return SENTIMENT_LABELS["slightly delayed"]
-    elif delta_days == 0:
-        return SENTIMENT_LABELS["on time"]
-    elif delta_days < 0:
-        return SENTIMENT_LABELS["delivered early"]
-    return None
-
-def update_dropdown(task_id, field_id, option_id):
-    """
-    Update a dropdown custom field value on a task.
-    """
-    url = f"https://api.clickup.com/api/v2/task/{task_id}/field/{field_id}"
-    payload = {"value": option_id}
-
-    if DRY_RUN:
-        print(f"🔎 DRY RUN | Would update task {task_id} field {field_id} -> option {option_id}")
-        return True
-
-    r = requests.post(url, headers=HEADERS, json=payload)
-    if r.status_code in (200, 204):
-        return True
-
-    print(f"❌ Update failed for {task_id} ({field_id}): {r.status_code} {r.text}")
-    return False
+    return rules_for(lst).sentiment_table(platform).classify(delta_days)
 
 # ============================
 # MAIN
 # ============================
 
-def run():
-    # Fetch field definitions once (needed to resolve indices -> option ids)
-    url_fields = f"https://api.clickup.com/api/v2/list/{LIST_ID}/field"
-    fields_resp = requests.get(url_fields, headers=HEADERS)
-    fields_resp.raise_for_status()
-    list_fields = fields_resp.json().get("fields", [])
-
-    baseline_field_def = next((f for f in list_fields if f["id"] == FIELD_BASELINE), None)
-    sentiment_field_def = next((f for f in list_fields if f["id"] == FIELD_SENTIMENT), None)
-    if not baseline_field_def or not sentiment_field_def:
-        raise RuntimeError("Baseline or Sentiment field definitions not found in list fields.")
-
-    fetch_dropdowns()
-
-    tasks = get_all_tasks()
-    print(f"🔎 Fetched {len(tasks)} tasks (API-side filtered by tag + custom_fields).")
-
-    updated = skipped = missing_data = 0
-    required_tag_plain = normalize_tag(REQUIRED_TAG)  # e.g., '%23new' -> 'new'
+def process_tasks(tasks, queue, lst=LIST):
+    """
+    Queue sentiment changes. Returns (queued, skipped, missing_data).
+    """
+    queued = skipped = missing_data = 0
+    if lst.refresh_stale_options(tasks):
+        fetch_dropdowns(lst.fields, lst)
+    required_tag_plain = lst.tag_plain  # e.g., '%23new' -> 'new'
+    field_sentiment = lst.sentiment_field_id
+    sentiment_dropdown = lst.resolver(field_sentiment)
+    per_platform = rules_for(lst).per_platform_sentiment()
 
+    # First pass: deltas of the tasks with usable data
+    ready = []
     for task in tasks:
-        task_id = task["id"]
+        task_id = task.id
 
         # Client-side guard (redundant but safe if filters change upstream)
-        if required_tag_plain and not task_has_tag(task, required_tag_plain):
+        if not lst.has_required_tag(task.tags):
             skipped += 1
             print(f"⛔ {task_id} skipped: missing '#{required_tag_plain}' tag")
             continue
 
-        actual_days = get_actual_days(task)
-        baseline_days = get_baseline_days(task, baseline_field_def)
+        actual_days = get_actual_days(task, lst)
+        baseline_days = get_baseline_days(task, lst)
 
         if actual_days is None or baseline_days is None:
             missing_data += 1
             print(f"⚠️ {task_id} missing/invalid data | actual={actual_days} baseline={baseline_days}")
             continue
 
-        delta = actual_days - baseline_days
-        target_label = classify_sentiment(delta)
+        ready.append((task, actual_days - baseline_days))
+
+    # Classify the whole batch with the compiled threshold tables
+    deltas = [delta for _, delta in ready]
+    classes = [platform_class(task, lst) for task, _ in ready] if per_platform else None
+    targets = sentiment_options(deltas, classes, lst)
+
+    for (task, delta), (target_label, target_id) in zip(ready, targets):
+        task_id = task.id
         if not target_label:
             skipped += 1
             print(f"⚠️ {task_id} no target label for Δ={delta}d")
             continue
 
-        target_id = SENTIMENT_NAME_TO_ID.get(normalize_label(target_label))
         if not target_id:
             skipped += 1
             print(f"⚠️ {task_id} sentiment label not found in dropdown: {target_label}")
             continue
 
-        current_id = get_current_sentiment_option_id(task, sentiment_field_def)
+        current_id = get_current_sentiment_option_id(task, lst)
         if current_id == target_id:
             skipped += 1
-            print(f"⏭️ {task_id} already set: {SENTIMENT_ID_TO_NAME.get(current_id)} (Δ={delta}d)")
+            print(f"⏭️ {task_id} already set: {sentiment_dropdown.id_to_name.get(current_id)} (Δ={delta}d)")
             continue
 
-        ok = update_dropdown(task_id, FIELD_SENTIMENT, target_id)
-        if ok:
-            updated += 1
+        if queue.add(task, field_sentiment, target_id, field_type="drop_down", label="Sentiment", current=current_id):
+            queued += 1
             print(f"✅ {task_id} | Δ={delta}d → {target_label}")
-            if PAUSE_MS > 0:
-                time.sleep(PAUSE_MS / 1000.0)
         else:
-            print(f"❌ {task_id} update failed | intended {target_label} (Δ={delta}d)")
+            skipped += 1
+
+    return queued, skipped, missing_data
+
+def run():
+    with metrics.stage("resolve"):
+        fetch_dropdowns()
+
+    report, totals = run_pages(
+        "sentiment", LIST_ID, iter_task_pages(), HEADERS,
+        lambda tasks, queue: (len(tasks), *process_tasks(tasks, queue)),
+        LIST.dry_run,
+    )
+    processed, _, skipped, missing_data = totals or (0, 0, 0, 0)
+    print(f"🔎 Processed {processed} tasks (API-side filtered by tag + custom_fields).")
+    updated = report.written
 
     print("\n" + "=" * 60)
     print(f"Summary: {updated} updated | {skipped} skipped | {missing_data} missing data")
     print("=" * 60)
+    metrics.export("sentiment")
 
 if __name__ == "__main__":
     run()
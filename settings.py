@@ -0,0 +1,16 @@
+import json
+import os
+
+# ============================
+# LOAD CONFIG
+# ============================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "clickup_config.json")
+
+with open(CONFIG_PATH, "r") as f:
+    cfg = json.load(f)
+
+# Local state (field cache, snapshots, checkpoints, plans, metrics, history);
+# CLICKUP_STATE_DIR points a run somewhere else (e.g. bench/run_benchmarks.py)
+STATE_DIR = os.environ.get("CLICKUP_STATE_DIR") or os.path.join(BASE_DIR, cfg.get("state_dir", "state"))
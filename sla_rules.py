@@ -0,0 +1,184 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # classify_many falls back to bisect per delta
+    np = None
+
+# ============================
+# DEFAULT RULES
+# ============================
+
+# Platform classes in match order: the first class with a keyword contained in
+# the platform dropdown's option name wins, otherwise DEFAULT_PLATFORM_CLASS
+PLATFORM_CLASSES = {
+    "shopify": ["shopify"],
+    "rich": ["woo", "woocommerce", "magento", "sfcc", "big"],
+}
+DEFAULT_PLATFORM_CLASS = "custom"
+
+# Baseline dropdown option name per platform class
+BASELINES = {
+    "shopify": "9d",
+    "rich": "21d",
+    "custom": "35d",
+}
+
+# Sentiment per platform class ("default" for the rest): [min_delta, label]
+# rows, where delta = actual - baseline in days and a null min_delta catches
+# everything below the first bound
+SENTIMENT_THRESHOLDS = {
+    "default": [
+        [None, "delivered early"],
+        [0, "on time"],
+        [1, "slightly delayed"],
+        [5, "escalated, at risk"],
+    ],
+}
+
+# ============================
+# COMPILED TABLES
+# ============================
+
+class ThresholdTable:
+    """
+    Sorted lower bounds plus one label per band; a delta maps to the band of
+    the last bound <= delta (bisect), None below the first bound unless a
+    catch-all row is given.
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda r: float("-inf") if r[0] is None else r[0])
+        catch_all = [label for bound, label in rows if bound is None]
+        if len(catch_all) > 1:
+            raise ValueError(f"More than one catch-all sentiment row: {catch_all}")
+
+        self.bounds = [bound for bound, _ in rows if bound is not None]
+        self.labels = [catch_all[0] if catch_all else None] + [label for bound, label in rows if bound is not None]
+        self._np_bounds = np.array(self.bounds) if np is not None else None
+
+    def index(self, delta):
+        return bisect_right(self.bounds, delta)
+
+    def index_many(self, deltas):
+        """Band index for every delta in one pass (numpy searchsorted when installed)."""
+        if self._np_bounds is None:
+            return [bisect_right(self.bounds, d) for d in deltas]
+        return np.searchsorted(self._np_bounds, np.asarray(deltas), side="right").tolist()
+
+    def classify(self, delta):
+        return self.labels[self.index(delta)]
+
+class SlaRules:
+    """
+    Platform classes, baselines and sentiment thresholds for one list, from its
+    config (platform_classes, default_platform_class, baselines,
+    sentiment_thresholds) or the defaults above.
+    """
+
+    def __init__(self, config):
+        classes = config.get("platform_classes") or PLATFORM_CLASSES
+        self.platform_classes = [
+            (name, tuple(k.strip().lower() for k in keywords))
+            for name, keywords in classes.items()
+        ]
+        self.default_class = config.get("default_platform_class") or DEFAULT_PLATFORM_CLASS
+        self.baselines = config.get("baselines") or BASELINES
+
+        missing = [c for c in self.class_names() if c not in self.baselines]
+        if missing:
+            raise ValueError(f"No baseline configured for platform classes: {missing}")
+
+        thresholds = config.get("sentiment_thresholds") or SENTIMENT_THRESHOLDS
+        if "default" not in thresholds:
+            raise ValueError("sentiment_thresholds needs a 'default' entry")
+        self.sentiment = {name: ThresholdTable(rows) for name, rows in thresholds.items()}
+
+    def class_names(self):
+        return [name for name, _ in self.platform_classes] + [self.default_class]
+
+    def class_of_name(self, platform_name):
+        name = (platform_name or "").lower()
+        for cls, keywords in self.platform_classes:
+            if any(k in name for k in keywords):
+                return cls
+        return self.default_class
+
+    def per_platform_sentiment(self):
+        """True when some class has its own thresholds (sentiment then needs the platform)."""
+        return len(self.sentiment) > 1
+
+    def sentiment_labels(self):
+        return sorted({label for table in self.sentiment.values() for label in table.labels if label})
+
+    def sentiment_table(self, platform_class=None):
+        return self.sentiment.get(platform_class) or self.sentiment["default"]
+
+# ============================
+# PER-LIST LOOKUPS
+# ============================
+
+def rules_for(lst):
+    if "rules" not in lst.cache:
+        lst.cache["rules"] = SlaRules(lst.config)
+    return lst.cache["rules"]
+
+def _platform_classes(lst):
+    # option id -> class, once per platform dropdown schema
+    key = "field:platform_classes"
+    if key not in lst.cache:
+        rules = rules_for(lst)
+        resolver = lst.resolver(lst.commerce_platform_field_id)
+        lst.cache[key] = {
+            option_id: rules.class_of_name(name)
+            for option_id, name in (resolver.id_to_name.items() if resolver else ())
+        }
+    return lst.cache[key]
+
+def platform_class(task, lst):
+    """Platform class of a task from its commerce platform dropdown value."""
+    field_id = lst.commerce_platform_field_id
+    resolver = lst.resolver(field_id)
+    option_id = resolver.resolve(task.get(field_id)) if resolver else None
+    return _platform_classes(lst).get(option_id, rules_for(lst).default_class)
+
+def baseline_option(platform_class, lst):
+    """(label, option id) of the baseline for a platform class; id is None if the dropdown lacks it."""
+    key = "field:baseline_options"
+    if key not in lst.cache:
+        resolver = lst.resolver(lst.baseline_field_id)
+        lst.cache[key] = {
+            cls: (label, resolver.id_for(label) if resolver else None)
+            for cls, label in rules_for(lst).baselines.items()
+        }
+    return lst.cache[key][platform_class]
+
+def sentiment_options(deltas, classes, lst):
+    """
+    (label, option id) per delta, with each delta classified by its platform
+    class's thresholds (classes may be None when only defaults are set). One
+    lookup pass per threshold table.
+    """
+    rules = rules_for(lst)
+    resolver = lst.resolver(lst.sentiment_field_id)
+
+    key = "field:sentiment_ids"
+    if key not in lst.cache:
+        lst.cache[key] = {
+            name: [resolver.id_for(label) if (resolver and label) else None for label in table.labels]
+            for name, table in rules.sentiment.items()
+        }
+    ids = lst.cache[key]
+
+    groups = defaultdict(list)
+    for i in range(len(deltas)):
+        cls = classes[i] if classes is not None else None
+        groups[cls if cls in rules.sentiment else "default"].append(i)
+
+    out = [None] * len(deltas)
+    for name, indexes in groups.items():
+        table = rules.sentiment[name]
+        for i, band in zip(indexes, table.index_many([deltas[i] for i in indexes])):
+            out[i] = (table.labels[band], ids[name][band])
+    return out
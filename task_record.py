@@ -0,0 +1,92 @@
+from datetime import datetime
+
+# ============================
+# TASK RECORD
+# ============================
+
+class TaskRecord:
+    """
+    Compact view of a ClickUp task built once at ingest: custom field values keyed
+    by field id (no more scanning task["custom_fields"] per lookup) and date fields
+    decoded up front. `raw` is the original task dict; set() writes through to it
+    so snapshots stay in sync.
+    """
+
+    __slots__ = ("id", "name", "status", "status_type", "date_created", "date_updated",
+                 "tags", "values", "types", "dates", "raw")
+
+    def __init__(self, task):
+        status = task.get("status") or {}
+
+        self.id = task["id"]
+        self.name = task.get("name")
+        self.status = status.get("status") or ""
+        self.status_type = status.get("type")
+        self.date_created = int(task["date_created"]) if task.get("date_created") else None
+        self.date_updated = int(task["date_updated"]) if task.get("date_updated") else None
+        self.tags = tuple((t.get("name") or "").lower() for t in task.get("tags", []))
+        self.values = {}
+        self.types = {}
+        self.dates = {}
+        self.raw = task
+
+        for f in task.get("custom_fields", []):
+            self.values[f["id"]] = f.get("value")
+            self.types[f["id"]] = f.get("type")
+            self._decode(f["id"])
+
+    def _decode(self, field_id):
+        value = self.values.get(field_id)
+        if self.types.get(field_id) == "date" and value:
+            self.dates[field_id] = datetime.fromtimestamp(int(value) / 1000).date()
+        else:
+            self.dates.pop(field_id, None)
+
+    def get(self, field_id):
+        return self.values.get(field_id)
+
+    def set(self, field_id, value, field_type=None):
+        """Record a value written to ClickUp, here and on the raw task."""
+        self.values[field_id] = value
+        if field_type:
+            self.types[field_id] = field_type
+        self._decode(field_id)
+
+        for f in self.raw.setdefault("custom_fields", []):
+            if f["id"] == field_id:
+                f["value"] = value
+                return
+        entry = {"id": field_id, "value": value}
+        if field_type:
+            entry["type"] = field_type
+        self.raw["custom_fields"].append(entry)
+
+def normalize(tasks):
+    return [TaskRecord(t) for t in tasks]
+
+def project(task, field_ids=None):
+    """
+    Slim copy of a raw ClickUp task with only what the stages read: id, name,
+    status, dates, tag names and custom field id/type/value (limited to
+    field_ids when given). Descriptions, assignees, checklists and each field's
+    type_config (every dropdown option, repeated per task) are dropped.
+    """
+    status = task.get("status") or {}
+    return {
+        "id": task["id"],
+        "name": task.get("name"),
+        "status": {"status": status.get("status"), "type": status.get("type")},
+        "date_created": task.get("date_created"),
+        "date_updated": task.get("date_updated"),
+        "tags": [{"name": t.get("name")} for t in task.get("tags", [])],
+        "custom_fields": [
+            {"id": f["id"], "type": f.get("type"), "value": f.get("value")}
+            for f in task.get("custom_fields", [])
+            if field_ids is None or f["id"] in field_ids
+        ],
+    }
+
+def projector(field_ids=None):
+    """project() bound to a field set, for page_fetcher."""
+    field_ids = frozenset(field_ids) if field_ids is not None else None
+    return lambda task: project(task, field_ids)
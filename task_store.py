@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+
+from settings import STATE_DIR, cfg
+
+# ============================
+# CONFIGURATION
+# ============================
+
+STORE_FILE = os.path.join(STATE_DIR, "clickup.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id           TEXT PRIMARY KEY,
+    date_updated INTEGER,
+    data         TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    id   TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+-- Never read: values live in the task JSON, options in the field definitions
+DROP TABLE IF EXISTS field_values;
+DROP TABLE IF EXISTS dropdown_options;
+"""
+
+# ============================
+# TASK STORE
+# ============================
+
+class TaskStore:
+    """
+    Local SQLite snapshot of the list: raw tasks (keyed by id, with the fetched
+    date_updated), the list field definitions, plus small sync metadata
+    (watermarks). pipeline.py and the webhook server keep it current and
+    --offline runs read it.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    # ---------- meta ----------
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+
+    # ---------- tasks ----------
+
+    def load_tasks(self):
+        """All stored tasks as task id -> task dict."""
+        return {
+            task_id: json.loads(data)
+            for task_id, data in self.conn.execute("SELECT id, data FROM tasks")
+        }
+
+    def count_tasks(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _upsert(self, tasks):
+        for t in tasks:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, date_updated, data) VALUES (?, ?, ?)",
+                (t["id"], int(t.get("date_updated") or 0), json.dumps(t)),
+            )
+
+    def upsert_tasks(self, tasks):
+        with self.lock, self.conn:
+            self._upsert(tasks)
+
+    def delete_tasks(self, task_ids):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def replace_tasks(self, tasks):
+        """Swap the whole snapshot (full resync)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self._upsert(tasks)
+
+    # ---------- field definitions ----------
+
+    def save_fields(self, fields):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM fields")
+            for field in fields:
+                self.conn.execute(
+                    "INSERT INTO fields (id, data) VALUES (?, ?)",
+                    (field["id"], json.dumps(field)),
+                )
+
+    def load_fields(self):
+        return [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM fields")]
+
+    def close(self):
+        self.conn.close()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def store_path(list_id=None):
+    # The configured list keeps the original file; other lists get one each
+    if list_id is None or list_id == cfg["list_id"]:
+        return STORE_FILE
+    return os.path.join(STATE_DIR, f"clickup_{list_id}.sqlite3")
+
+def get_store(list_id=None):
+    """
+    Shared store for the process, one per list.
+    """
+    path = store_path(list_id)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = TaskStore(path)
+        return _stores[path]
@@ -0,0 +1,70 @@
+import time
+
+from settings import cfg
+from task_store import get_store
+
+# ============================
+# CONFIGURATION
+# ============================
+
+FULL_RESYNC_DAYS = float(cfg.get("full_resync_days", 7))
+
+# Re-read a small window before the watermark so clock skew can't drop an update
+WATERMARK_OVERLAP_MS = 60 * 1000
+
+# ============================
+# STATE
+# ============================
+
+def load_state(store=None):
+    return (store or get_store()).get_meta("sync_state", {})
+
+def save_state(state, store=None):
+    (store or get_store()).set_meta("sync_state", state)
+
+def save_snapshot(tasks, store=None):
+    """Persist tasks the stages changed in memory."""
+    (store or get_store()).upsert_tasks(tasks)
+
+# ============================
+# SYNC
+# ============================
+
+def full_resync_due(state, now_ms):
+    last_full = state.get("last_full_sync")
+    if not last_full or state.get("watermark") is None:
+        return True
+    return now_ms - last_full >= FULL_RESYNC_DAYS * 86400 * 1000
+
+def sync_tasks(fetch_tasks, has_tag, force_full=False, store=None):
+    """
+    Bring the local snapshot up to date and return it (task id -> task).
+
+    fetch_tasks(updated_gt=None) returns tagged tasks when updated_gt is None,
+    otherwise every task changed after updated_gt (tag filter left to has_tag,
+    so tasks that lost the tag drop out of the snapshot).
+    A full resync runs when forced, on first run, or every FULL_RESYNC_DAYS.
+    Uses the default list's store unless `store` is given.
+    """
+    store = store or get_store()
+    state = load_state(store)
+    now_ms = int(time.time() * 1000)
+
+    if force_full or not store.count_tasks() or full_resync_due(state, now_ms):
+        tasks = fetch_tasks()
+        store.replace_tasks(tasks)
+        state["last_full_sync"] = now_ms
+        print(f"🔄 Full sync: {len(tasks)} tasks")
+    else:
+        tasks = fetch_tasks(updated_gt=state["watermark"])
+        changed = [t for t in tasks if has_tag(t)]
+        dropped = [t["id"] for t in tasks if not has_tag(t)]
+        store.upsert_tasks(changed)
+        store.delete_tasks(dropped)
+        print(f"🔄 Incremental sync: {len(changed)} changed | {len(dropped)} untagged")
+
+    newest = max((int(t.get("date_updated") or 0) for t in tasks), default=0)
+    state["watermark"] = max(newest - WATERMARK_OVERLAP_MS, state.get("watermark") or 0)
+    save_state(state, store)
+
+    return store.load_tasks()
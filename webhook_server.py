@@ -0,0 +1,205 @@
+import argparse
+import hashlib
+import hmac
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+import pipeline
+from change_plan import PlanWriter, plan_path
+from settings import cfg
+from task_store import get_store
+from write_engine import backoff_delay
+
+# ============================
+# CONFIGURATION
+# ============================
+
+WEBHOOK_SECRET = cfg.get("webhook_secret")
+WEBHOOK_HOST = cfg.get("webhook_host", "127.0.0.1")
+WEBHOOK_PORT = int(cfg.get("webhook_port", 8080))
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+# Events are acknowledged before they run and ClickUp never redelivers them,
+# so a failed event (429, network error, failed write) is retried here
+EVENT_RETRIES = int(cfg.get("webhook_event_retries", 5))
+EVENT_RETRY_BASE_S = float(cfg.get("webhook_retry_backoff_s", 5))
+
+# taskUpdated only matters when one of the inputs to the stages changed;
+# ignoring everything else also keeps our own field writes from looping back
+WATCHED_FIELDS = {
+    cfg["kickoff_field_id"],
+    cfg["go_live_field_id"],
+    cfg["commerce_platform_field_id"],
+}
+
+HANDLED_EVENTS = {"taskCreated", "taskStatusUpdated", "taskUpdated", "taskTagUpdated"}
+
+# ============================
+# EVENT HANDLING
+# ============================
+
+def is_relevant(event):
+    name = event.get("event")
+    if name not in HANDLED_EVENTS or not event.get("task_id"):
+        return False
+    if name != "taskUpdated":
+        return True
+
+    for item in event.get("history_items", []):
+        field = item.get("custom_field") or {}
+        if field.get("id") in WATCHED_FIELDS or item.get("field") in WATCHED_FIELDS:
+            return True
+    return False
+
+def verify_signature(body, signature):
+    if not WEBHOOK_SECRET:
+        return True
+    expected = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+class EventProcessor:
+    """
+    Single worker draining webhook events so stages never run concurrently
+    (they share the default list's dropdown maps). Field definitions come from
+    the field cache, so they are only refetched once its TTL expires.
+    With dry_run, changes are appended to a change plan instead of sent.
+
+    A failing event is re-queued with exponential backoff up to EVENT_RETRIES
+    times; outcomes are counted in the run metrics (state/metrics/webhook.json).
+    """
+
+    def __init__(self):
+        self.plan = None
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self._work, name="webhook-events", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def current_plan(self):
+        """
+        Today's webhook plan with dry_run (None otherwise). Restarts append to
+        it rather than truncating it, and a new file starts at midnight.
+        """
+        if not pipeline.LIST.dry_run:
+            return None
+        if self.plan is None or self.plan.path != plan_path("webhook", pipeline.LIST_ID):
+            if self.plan is not None:
+                self.plan.close()
+            self.plan = PlanWriter.for_today("webhook", pipeline.LIST_ID, append=True)
+        return self.plan
+
+    def submit(self, event):
+        self.events.put(event)
+
+    def handle(self, event):
+        task_id = event["task_id"]
+        task = pipeline.get_task(task_id)
+
+        if task is None:
+            print(f"⊘ {task_id} ({event['event']}) skipped: not in list {pipeline.LIST_ID}")
+            return
+
+        if not pipeline.has_required_tag(task):
+            get_store().delete_tasks([task_id])
+            print(f"⊘ {task_id} ({event['event']}) skipped: missing required tag")
+            return
+
+        print(f"📨 {event['event']} → {task_id}")
+        plan = self.current_plan()
+        report = pipeline.run_stages([task], pipeline.fetch_fields(), plan=plan)
+        if plan is None:
+            # Failed writes were rolled back, so the task holds what ClickUp has
+            get_store().upsert_tasks([task])
+        if report.failed_total:
+            raise RuntimeError(f"{report.failed_total} field writes failed")
+
+    def retry(self, event, error):
+        attempt = event.get("_attempt", 0)
+        if attempt >= EVENT_RETRIES:
+            metrics.get_metrics().add_event("dropped")
+            print(f"❌ Giving up on {event.get('event')} for {event.get('task_id')} after {attempt + 1} attempts: {error}")
+            return
+
+        wait = backoff_delay(attempt, base=EVENT_RETRY_BASE_S, cap=300)
+        metrics.get_metrics().add_event("retried")
+        print(f"⏳ {event.get('event')} for {event.get('task_id')} failed ({error}), retrying in {wait:.1f}s")
+        timer = threading.Timer(wait, self.submit, ({**event, "_attempt": attempt + 1},))
+        timer.daemon = True
+        timer.start()
+
+    def _work(self):
+        while True:
+            event = self.events.get()
+            try:
+                self.handle(event)
+                metrics.get_metrics().add_event("processed")
+            except Exception as e:
+                self.retry(event, e)
+            finally:
+                self.events.task_done()
+            if self.events.empty():
+                metrics.export("webhook")
+
+# ============================
+# HTTP SERVER
+# ============================
+
+def make_handler(processor):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if not verify_signature(body, self.headers.get("X-Signature")):
+                self.send_response(401)
+                self.end_headers()
+                return
+
+            try:
+                event = json.loads(body)
+            except ValueError:
+                event = None
+            if not isinstance(event, dict):
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            # Acknowledge right away; ClickUp retries slow endpoints
+            self.send_response(200)
+            self.end_headers()
+
+            if is_relevant(event):
+                processor.submit(event)
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+def serve(host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+    # Unsigned events are only accepted from this machine
+    if not WEBHOOK_SECRET and host not in LOCAL_HOSTS:
+        raise SystemExit(f"❌ webhook_secret is required to listen on {host}")
+
+    processor = EventProcessor()
+    processor.start()
+
+    server = ThreadingHTTPServer((host, port), make_handler(processor))
+    print(f"👂 Listening for ClickUp webhooks on {host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute a task's dates, baseline, aging and sentiment on ClickUp webhook events.")
+    parser.add_argument("--host", default=WEBHOOK_HOST)
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from clickup_http import get_session
+from settings import cfg
+
+# ============================
+# CONFIGURATION
+# ============================
+
+MAX_WORKERS = int(cfg.get("max_write_workers", 8))
+MAX_RETRIES = int(cfg.get("max_write_retries", 5))
+RETRY_BACKOFF_S = float(cfg.get("retry_backoff_s", 1))
+
+# Field writes set a value, so repeating one is safe
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# ============================
+# RATE LIMITER
+# ============================
+
+class RateLimiter:
+    """
+    Shared budget driven by ClickUp's X-RateLimit-Remaining / X-RateLimit-Reset
+    headers. Workers block once the budget is spent until the window resets.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = None      # unknown until the first response
+        self.reset_at = 0.0        # unix seconds
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.time()
+                if self.remaining is None or self.remaining > 0 or now >= self.reset_at:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+                wait = self.reset_at - now
+            time.sleep(min(wait, 60))
+
+    def update(self, response_headers):
+        remaining = response_headers.get("X-RateLimit-Remaining")
+        reset = response_headers.get("X-RateLimit-Reset")
+        with self.lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def block_until_reset(self, attempt):
+        """
+        Called on 429: drain the budget and return how long to sleep. Falls back to
+        exponential backoff with jitter when the reset header is missing.
+        """
+        with self.lock:
+            self.remaining = 0
+            wait = self.reset_at - time.time()
+            if wait <= 0:
+                wait = min(2 ** attempt, 60) + random.random()
+                self.reset_at = time.time() + wait
+        return wait
+
+def backoff_delay(attempt, base=RETRY_BACKOFF_S, cap=60):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+# ============================
+# WRITE ENGINE
+# ============================
+
+class WriteEngine:
+    def __init__(self, max_workers=MAX_WORKERS, max_retries=MAX_RETRIES):
+        self.max_retries = max_retries
+        self.limiter = RateLimiter()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clickup-write")
+
+    def request(self, method, url, **kwargs):
+        """
+        Blocking request honouring the shared rate limit. 429s wait for the rate-limit
+        reset; 5xx responses and connection errors retry with exponential backoff
+        and jitter. Returns the final response (re-raises the last connection error).
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                r = get_session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = backoff_delay(attempt)
+                print(f"⏳ {type(e).__name__}, retrying in {wait:.1f}s")
+                time.sleep(wait)
+                attempt += 1
+                continue
+
+            self.limiter.update(r.headers)
+
+            if attempt >= self.max_retries:
+                return r
+
+            if r.status_code == 429:
+                wait = self.limiter.block_until_reset(attempt)
+                print(f"⏳ Rate limited, retrying in {wait:.1f}s")
+            elif r.status_code in RETRY_STATUSES:
+                wait = backoff_delay(attempt)
+                print(f"⏳ ClickUp {r.status_code}, retrying in {wait:.1f}s")
+            else:
+                return r
+
+            time.sleep(wait)
+            attempt += 1
+
+    def post(self, url, payload, headers):
+        return self.request("POST", url, headers=headers, json=payload)
+
+    def get(self, url, headers):
+        """Reads draw from the same budget and wait out a 429 the same way."""
+        return self.request("GET", url, headers=headers)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run a (blocking) update function on the worker pool. Returns a Future.
+        """
+        return self.pool.submit(fn, *args, **kwargs)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """
+    Process-wide engine shared by every script so they draw from one rate-limit budget.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = WriteEngine()
+        return _engine
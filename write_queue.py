@@ -0,0 +1,256 @@
+import threading
+from collections import Counter, defaultdict
+
+import metrics
+from clickup_http import API_BASE
+from write_engine import get_engine
+
+# ============================
+# WRITE QUEUE
+# ============================
+
+class FieldWrite:
+    __slots__ = ("task", "field_id", "value", "payload", "field_type", "label", "previous")
+
+    def __init__(self, task, field_id, value, payload, field_type, label, previous):
+        self.task = task
+        self.field_id = field_id
+        self.value = value
+        self.payload = payload
+        self.field_type = field_type
+        self.label = label
+        self.previous = previous
+
+class FlushReport:
+    """
+    Outcome of a flush: per-field success/failure counts plus the failed writes.
+    """
+
+    def __init__(self):
+        self.ok = Counter()
+        self.failed = Counter()
+        self.failures = []
+
+    @property
+    def written(self):
+        return sum(self.ok.values())
+
+    @property
+    def failed_total(self):
+        return sum(self.failed.values())
+
+    def merge(self, other):
+        self.ok.update(other.ok)
+        self.failed.update(other.failed)
+        self.failures.extend(other.failures)
+        return self
+
+    def print_summary(self):
+        for label in sorted(set(self.ok) | set(self.failed)):
+            print(f"   {label}: {self.ok[label]} written | {self.failed[label]} failed")
+
+class PendingFlush:
+    def __init__(self, futures, tracker=None):
+        self.futures = futures
+        self.tracker = tracker
+
+    def wait(self):
+        report = FlushReport()
+        for write, future in self.futures:
+            try:
+                r = future.result()
+            except Exception as e:
+                # Retries exhausted on a connection error
+                status, detail = None, e
+            else:
+                if r.status_code in (200, 204):
+                    report.ok[write.label] += 1
+                    continue
+                status, detail = r.status_code, r.text
+
+            # Roll the optimistic in-memory value back
+            write.task.set(write.field_id, write.previous)
+            report.failed[write.label] += 1
+            report.failures.append((write, status))
+            print(f"❌ Failed {write.label} for {write.task.id}: {status} {detail}")
+
+        # Done-callbacks can still be running after result() returns
+        if self.tracker is not None:
+            self.tracker.wait()
+        return report
+
+def succeeded(future):
+    return not future.exception() and future.result().status_code in (200, 204)
+
+class TaskTracker:
+    """
+    Marks a task done in the checkpoint once every one of its writes succeeded.
+    Called from the engine's worker threads.
+    """
+
+    def __init__(self, checkpoint, counts):
+        self.checkpoint = checkpoint
+        self.pending = dict(counts)
+        self.remaining = sum(counts.values())
+        self.failed = set()
+        self._lock = threading.Lock()
+        self._settled = threading.Condition(self._lock)
+
+    def callback(self, task_id):
+        def done(future):
+            try:
+                ok = succeeded(future)
+                with self._lock:
+                    if not ok:
+                        self.failed.add(task_id)
+                    self.pending[task_id] -= 1
+                    finished = not self.pending[task_id] and task_id not in self.failed
+                if finished:
+                    self.checkpoint.mark_done(task_id)
+            finally:
+                # Always count the write, or wait() would hang on a failed mark_done
+                with self._settled:
+                    self.remaining -= 1
+                    if not self.remaining:
+                        self._settled.notify_all()
+        return done
+
+    def wait(self):
+        """Block until every write's callback has run."""
+        with self._settled:
+            self._settled.wait_for(lambda: not self.remaining)
+
+class WriteQueue:
+    """
+    Collects every field change produced in a run and sends them in one stage:
+
+      - one write per (task, field); a later change replaces an earlier one
+      - writes equal to the value already on the task are dropped
+      - the new value is applied to the in-memory record right away, so later
+        stages see it; it is rolled back if the write fails
+      - writes are ordered field by field so concurrent workers touch different
+        tasks, then flushed through the shared rate-limited write engine
+      - with a checkpoint, tasks finished by an interrupted run are applied in
+        memory only, and tasks are marked done as their writes land
+    """
+
+    def __init__(self, headers, checkpoint=None):
+        self.headers = headers
+        self.checkpoint = checkpoint
+        self.writes = {}
+        self.dropped = 0
+        self.resumed = 0
+
+    def __len__(self):
+        return len(self.writes)
+
+    def add(self, task, field_id, value, payload=None, field_type=None, label=None, current=None):
+        """
+        Queue a write. `current` overrides the value compared against for no-op
+        detection (e.g. a resolved dropdown option id). Returns False for no-ops.
+        """
+        existing = current if current is not None else task.get(field_id)
+        if existing is not None and str(existing) == str(value):
+            self.dropped += 1
+            return False
+
+        if self.checkpoint is not None and self.checkpoint.is_done(task.id):
+            # Already written before the interruption
+            task.set(field_id, value, field_type)
+            self.resumed += 1
+            return False
+
+        key = (task.id, field_id)
+        previous = self.writes[key].previous if key in self.writes else task.get(field_id)
+        self.writes[key] = FieldWrite(
+            task, field_id, value,
+            payload if payload is not None else {"value": value},
+            field_type, label or field_id, previous,
+        )
+        task.set(field_id, value, field_type)
+        return True
+
+    def put(self, write):
+        """Queue a ready-made FieldWrite (e.g. from a change plan) as is."""
+        self.writes[(write.task.id, write.field_id)] = write
+
+    def drain(self):
+        """Everything queued so far, in send order; the queue is left empty."""
+        ordered = sorted(self.writes.values(), key=lambda w: (w.label, w.field_id))
+        self.writes = {}
+        return ordered
+
+    def start(self):
+        """
+        Submit everything queued so far; returns a PendingFlush to wait on.
+        """
+        engine = get_engine()
+        ordered = self.drain()
+
+        tracker = None
+        if self.checkpoint is not None:
+            counts = defaultdict(int)
+            for write in ordered:
+                counts[write.task.id] += 1
+            tracker = TaskTracker(self.checkpoint, counts)
+
+        futures = []
+        for write in ordered:
+            url = f"{API_BASE}/task/{write.task.id}/field/{write.field_id}"
+            future = engine.submit(engine.post, url, write.payload, self.headers)
+            if tracker is not None:
+                future.add_done_callback(tracker.callback(write.task.id))
+            futures.append((write, future))
+        return PendingFlush(futures, tracker)
+
+    def flush(self):
+        return self.start().wait()
+
+def stream_pages(pages, headers, process_page, checkpoint=None, plan=None, on_written=None):
+    """
+    Run a stage over pages with bounded memory: each page gets its own queue,
+    its writes drain while the next page is fetched and processed, and nothing
+    of it is kept once they land. With a change_plan.PlanWriter the writes go
+    to the plan instead and nothing is sent.
+
+    process_page(tasks, queue) returns a tuple of counts, summed over pages.
+    on_written(tasks) runs once a page's writes have landed (failed ones
+    rolled back); it is not called with a plan.
+    Stage timings count only time spent blocked on each step.
+    Returns (FlushReport, totals); totals is None when there were no pages.
+    """
+    report = FlushReport()
+    totals = None
+    previous = None
+    pages = iter(pages)
+
+    def settle(page):
+        pending, tasks = page
+        with metrics.stage("write"):
+            report.merge(pending.wait())
+        if on_written is not None:
+            on_written(tasks)
+
+    while True:
+        with metrics.stage("fetch"):
+            tasks = next(pages, None)
+        if tasks is None:
+            break
+
+        queue = WriteQueue(headers, checkpoint)
+        with metrics.stage("compute"):
+            counts = process_page(tasks, queue)
+        totals = counts if totals is None else tuple(a + b for a, b in zip(totals, counts))
+
+        if plan is not None:
+            plan.add_queue(queue)
+            continue
+
+        pending = queue.start()
+        if previous:
+            settle(previous)
+        previous = (pending, tasks)
+
+    if previous:
+        settle(previous)
+    return report, totals